@@ -0,0 +1,40 @@
+# Concurrency
+DEFAULT_CONCURRENCY = 50
+
+# Connection pool
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# Timeouts
+DEFAULT_TIMEOUT = 30.0
+
+# Retries
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+RETRY_AFTER_MAX_DELAY = 120.0
+DEFAULT_RETRY_CODES = "408,429,500-599"
+
+# OAuth
+OAUTH_EXPIRY_MARGIN = 30.0
+OAUTH_DEFAULT_EXPIRES_IN = 3600.0
+
+# Latency
+LATENCY_PRECISION_BITS = 8
+LATENCY_MAX_SECONDS = 3600.0
+
+# Disk logs
+LOG_BUFFER_SIZE = 65536
+LOG_BATCH_SIZE = 4096
+LOG_FLUSH_INTERVAL = 0.5
+LOG_WRITE_BUFFER = 1024 * 1024
+LOG_MAX_BYTES = 64 * 1024 * 1024
+LOG_MAX_AGE = 24 * 60 * 60
+LOG_COMPRESS = True
+
+# Response bodies
+BODY_PREVIEW_BYTES = 1024
+
+# Load tests
+LOAD_MAX_IN_FLIGHT = 10000
+
+# Live runs
+LIVE_HISTORY_SECONDS = 600
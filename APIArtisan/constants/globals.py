@@ -12,3 +12,6 @@ APP_DEFAULT_DEBUG = False
 # Screensize
 DEFAULT_SCREEN_WIDTH = 1200
 DEFAULT_SCREEN_HEIGHT = 800
+
+# Lists
+LIST_PAGE_SIZE = 50
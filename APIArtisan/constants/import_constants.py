@@ -0,0 +1,22 @@
+# Budgets, in milliseconds, for importing a module in a fresh interpreter
+IMPORT_BUDGETS = {
+    "APIArtisan.models.config": 100,
+    "APIArtisan.utils.storage": 100,
+    "APIArtisan.execution.engine": 200,
+    "APIArtisan.run": 200,
+}
+
+# Packages none of the budgeted modules may import
+IMPORT_FORBIDDEN = (
+    "nicegui",
+    "fastapi",
+    "starlette",
+    "socketio",
+    "webview",
+    "clr",
+    "pythonnet",
+    "httpx",
+)
+
+# Measurement
+IMPORT_BUDGET_RUNS = 5
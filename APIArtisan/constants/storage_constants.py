@@ -9,14 +9,26 @@ DARK_MODE_KEY = "dark_mode"
 DARK_MODE_DEFAULT = DisplayMode.DARK.value
 APP_PORT_KEY = "app_port"
 APP_DEBUG_KEY = "app_debug"
+STORAGE_BACKEND_KEY = "storage_backend"
+STORAGE_BACKEND_FILES = "files"
+STORAGE_BACKEND_SQLITE = "sqlite"
+STORAGE_BACKEND_DEFAULT = STORAGE_BACKEND_FILES
 INDENTATION = 2
 
+# Autosave
+AUTOSAVE_INTERVAL = 1.0
+
+# Reading
+READ_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+READ_CHUNK_SIZE = 64
+
 # Default settings
 DEFAULT_SETTINGS = {
     GENERAL_KEY: {
         DARK_MODE_KEY: DisplayMode.DARK.value,
         APP_PORT_KEY: APP_DEFAULT_PORT,
         APP_DEBUG_KEY: APP_DEFAULT_DEBUG,
+        STORAGE_BACKEND_KEY: STORAGE_BACKEND_DEFAULT,
     }
 }
 
@@ -25,3 +37,6 @@ LOCAL_APP_DATA = os.path.expandvars(r"%LOCALAPPDATA%\APIArtisan")
 SETTINGS_JSON = os.path.join(LOCAL_APP_DATA, "settings.json")
 SECRETS_DIR = os.path.join(LOCAL_APP_DATA, "secrets")
 CONFIGS_DIR = os.path.join(LOCAL_APP_DATA, "configs")
+STORE_DATABASE = os.path.join(LOCAL_APP_DATA, "store.sqlite3")
+LOGS_DIR = os.path.join(LOCAL_APP_DATA, "logs")
+GENERIC_LOG = os.path.join(LOGS_DIR, "requests.log")
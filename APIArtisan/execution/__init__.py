@@ -0,0 +1,26 @@
+import importlib
+
+__all__ = [
+    "bodies",
+    "engine",
+    "feeds",
+    "latency",
+    "live",
+    "load",
+    "logs",
+    "oauth",
+    "processes",
+    "projection",
+    "rate_limit",
+    "request",
+    "retry",
+    "status_codes",
+    "templates",
+]
+
+
+def __getattr__(name: str):
+    # Submodules are imported on first use, so importing one doesn't import the others.
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
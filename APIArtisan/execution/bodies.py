@@ -0,0 +1,122 @@
+import os
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+import aiofiles
+
+from ..constants import execution_constants, storage_constants
+from ..models.output_config import OutputOption
+from .logs import run_stamp
+
+if TYPE_CHECKING:
+    import httpx
+
+    from ..models.config import Config
+    from .projection import JsonProjector
+
+
+class BodyPreview(NamedTuple):
+    path: str
+    size: int
+    truncated: bool
+    head: bytes
+
+
+class BodyCapture:
+    """
+    Streams the response bodies of a run to one file per request.
+
+    Bodies are written chunk by chunk as they arrive, so only the chunk in
+    hand and a short head kept for previews are ever in memory, however
+    large the body is.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sample_every: int = 1,
+        max_bytes: int = 0,
+        preview_bytes: int = execution_constants.BODY_PREVIEW_BYTES,
+    ):
+        """
+        Initializes a BodyCapture object.
+
+        Args:
+            directory (str): Where the bodies are written, created on the first write.
+            sample_every (int): Only store the body of one request in this many.
+            max_bytes (int): The most bytes stored per body, 0 for no limit.
+            preview_bytes (int): How many bytes from the start of each body are kept in memory.
+        """
+        self.directory = directory
+        self.sample_every = max(1, sample_every)
+        self.max_bytes = max_bytes
+        self.preview_bytes = preview_bytes
+        self._created = False
+
+    @classmethod
+    def from_config(
+        cls, config: "Config", stamp: Optional[str] = None
+    ) -> Optional["BodyCapture"]:
+        """
+        Args:
+            config (Config): The config being run.
+            stamp (str, optional): Names the directory of the run, see `run_stamp`.
+
+        Returns:
+            BodyCapture | None: Where the config's run stores bodies, or None if it doesn't.
+        """
+        output = config.output
+        if not output.is_enabled(OutputOption.RESPONSE_BODY):
+            return None
+        directory = os.path.join(
+            storage_constants.LOGS_DIR,
+            config.name,
+            "bodies",
+            stamp if stamp is not None else run_stamp(),
+        )
+        return cls(directory, output.body_sample_every, output.body_max_bytes)
+
+    def should_capture(self, index: int) -> bool:
+        return index % self.sample_every == 0
+
+    async def capture(
+        self, index: int, response: "httpx.Response", projector: Optional["JsonProjector"] = None
+    ) -> BodyPreview:
+        """
+        Stream a response's body to the request's file.
+
+        Args:
+            index (int): The position of the request in its run, which names the file.
+            response (httpx.Response): A streamed response whose body hasn't been read.
+            projector (JsonProjector, optional): Also fed the whole body, including what
+                is past `max_bytes`.
+
+        Raises:
+            OSError: If the file can't be written.
+
+        Returns:
+            BodyPreview: Where the body was written, its size and its first bytes.
+        """
+        if not self._created:
+            os.makedirs(self.directory, exist_ok=True)
+            self._created = True
+
+        path = os.path.join(self.directory, f"{index}.body")
+        head = bytearray()
+        size = 0
+        truncated = False
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in response.aiter_bytes():
+                if projector is not None:
+                    projector.feed(chunk)
+                if truncated:
+                    continue
+                if self.max_bytes and size + len(chunk) > self.max_bytes:
+                    chunk = chunk[: self.max_bytes - size]
+                    truncated = True
+                if len(head) < self.preview_bytes:
+                    head += chunk[: self.preview_bytes - len(head)]
+                await f.write(chunk)
+                size += len(chunk)
+                if truncated and projector is None:
+                    break
+        return BodyPreview(path, size, truncated, bytes(head))
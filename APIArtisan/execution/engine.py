@@ -0,0 +1,554 @@
+import asyncio
+import itertools
+import time
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Mapping,
+    Optional,
+    Union,
+)
+
+from ..constants import execution_constants
+from ..models.output_config import OutputOption
+from ..utils.secret_resolver import SecretResolver
+from .bodies import BodyCapture, BodyPreview
+from .feeds import WHOLE, Shard, VariableFeed
+from .latency import LatencyHistogram, LatencyRecorder, Phases, PhaseTimer
+from .logs import RunLogger, run_stamp
+from .oauth import OAuthCredentials, OAuthError, tokens
+from .projection import Projection
+from .rate_limit import RateLimiter
+from .request import PreparedRequest, prepare_request
+from .retry import RetryPolicy, parse_retry_after
+from .status_codes import DEFAULT_STATUS_CODES, StatusCodes
+from .templates import CompiledRequest
+
+if TYPE_CHECKING:
+    import httpx
+
+    from ..models.config import Config
+
+
+class ExecutionResult(NamedTuple):
+    index: int
+    status_code: Optional[int]
+    elapsed: float
+    error: Optional[str] = None
+    ok: bool = False
+    retry_after: Optional[float] = None
+    attempts: int = 1
+    phases: Optional[Phases] = None
+    body: Optional[BodyPreview] = None
+    projection: Optional[dict] = None
+    # Seconds from the send time a load test scheduled until the last attempt completed.
+    corrected: Optional[float] = None
+
+
+class RunSummary:
+    """
+    Counters describing a finished (or in progress) run.
+    """
+
+    def __init__(self, latency: bool = False):
+        """
+        Initializes a RunSummary object.
+
+        Args:
+            latency (bool): Whether to keep a histogram of each latency phase.
+        """
+        self.latency = LatencyRecorder() if latency else None
+        # The latencies of a load test counted from when each request was due, see `run_load`.
+        self.corrected: Optional[LatencyHistogram] = None
+        self.total = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.errored = 0
+        self.retries = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, result: ExecutionResult) -> None:
+        """
+        Count a single result.
+
+        Args:
+            result (ExecutionResult): The result of one request.
+        """
+        self.total += 1
+        self.retries += result.attempts - 1
+        if result.error is not None:
+            self.errored += 1
+        elif result.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        if self.latency is not None:
+            self.latency.record(result.phases)
+        if result.corrected is not None:
+            if self.corrected is None:
+                self.corrected = LatencyHistogram()
+            self.corrected.record(result.corrected)
+
+    def merge(self, other: "RunSummary") -> None:
+        """
+        Add the counters and latency histograms of another part of the run, such as
+        the summary of one worker process, to this summary.
+        """
+        self.total += other.total
+        self.succeeded += other.succeeded
+        self.failed += other.failed
+        self.errored += other.errored
+        self.retries += other.retries
+        if self.latency is not None and other.latency is not None:
+            self.latency.merge(other.latency)
+        if other.corrected is not None:
+            if self.corrected is None:
+                self.corrected = LatencyHistogram()
+            self.corrected.merge(other.corrected)
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def rate(self) -> float:
+        elapsed = self.elapsed
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        summary = {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "errored": self.errored,
+            "retries": self.retries,
+            "elapsed": round(self.elapsed, 3),
+            "rate": round(self.rate, 1),
+        }
+        if self.latency is not None:
+            summary["latency"] = self.latency.to_dict()
+        if self.corrected is not None:
+            summary["corrected_latency"] = self.corrected.to_dict()
+        return summary
+
+
+class RunOptions:
+    """
+    The per-run behaviour built from a config's Control Flow settings.
+    """
+
+    def __init__(
+        self,
+        status_codes: StatusCodes = DEFAULT_STATUS_CODES,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        credentials: Optional[OAuthCredentials] = None,
+        latency: bool = False,
+        logger: Optional[RunLogger] = None,
+        bodies: Optional[BodyCapture] = None,
+        projection: Optional[Projection] = None,
+        shard: Shard = WHOLE,
+    ):
+        self.status_codes = status_codes
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.credentials = credentials
+        self.latency = latency
+        self.logger = logger
+        self.bodies = bodies
+        self.projection = projection
+        self.shard = shard
+
+    @classmethod
+    def from_config(
+        cls,
+        config: "Config",
+        secrets: Optional[SecretResolver] = None,
+        stamp: Optional[str] = None,
+    ) -> "RunOptions":
+        """
+        Build the options of a config.
+
+        Args:
+            config (Config): The config to run.
+            secrets (SecretResolver, optional): Resolves the OAuth credentials.
+            stamp (str, optional): Names the files of the run, see `run_stamp`.
+
+        Raises:
+            ValueError: If the config's status codes or projection can't be parsed, or it
+                references a secret that does not exist.
+        """
+        return cls(
+            status_codes=StatusCodes.from_config(config),
+            retry_policy=RetryPolicy.from_config(config),
+            rate_limiter=RateLimiter.from_config(config),
+            credentials=OAuthCredentials.from_config(config, secrets),
+            latency=config.output.is_enabled(OutputOption.LATENCY),
+            bodies=BodyCapture.from_config(config, stamp),
+            projection=Projection.from_config(config),
+        )
+
+
+DEFAULT_RUN_OPTIONS = RunOptions()
+
+
+def config_requests(
+    config: "Config",
+    secrets: SecretResolver,
+    rows: Union[VariableFeed, Iterable[Mapping[str, str]], None] = None,
+    repeat: Optional[int] = 1,
+    shard: Shard = WHOLE,
+) -> Iterator[PreparedRequest]:
+    """
+    The requests of a config, one per input row, or its request repeated if there are no rows.
+
+    The config's templates are compiled once up front, so each row only costs
+    a render, and rows are read as the requests are pulled.
+
+    Args:
+        config (Config): The config to send.
+        secrets (SecretResolver): Resolves the referenced secrets, already prefetched.
+        rows (VariableFeed | Iterable[Mapping[str, str]], optional): The variable values
+            for each request.
+        repeat (int, optional): How many times to send the request when no rows are given,
+            None to send it for as long as requests are pulled.
+        shard (Shard): Only yield the rows and repeats of this shard.
+
+    Returns:
+        Iterator[PreparedRequest]: The requests, in order.
+    """
+    if rows is None:
+        request = prepare_request(config, secrets)
+        if repeat is None:
+            return itertools.islice(itertools.repeat(request), shard.index, None, shard.count)
+        return (request for _ in range(shard.index, repeat, shard.count))
+    compiled = CompiledRequest(config, secrets)
+    if isinstance(rows, VariableFeed):
+        values = rows.rows(compiled.variables, shard)
+    else:
+        owned = itertools.islice(rows, shard.index, None, shard.count)
+        values = (compiled.values_from(row) for row in owned)
+    return (compiled.render(row) for row in values)
+
+
+class Executor:
+    """
+    Sends requests through one pooled HTTP client with a bounded number in flight.
+
+    The client keeps connections alive between requests, so a run of thousands
+    of calls to the same host only pays for the TCP and TLS handshakes once per
+    pooled connection.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = execution_constants.DEFAULT_CONCURRENCY,
+        timeout: float = execution_constants.DEFAULT_TIMEOUT,
+    ):
+        """
+        Initializes an Executor object.
+
+        Args:
+            concurrency (int): The maximum number of requests in flight at once.
+            timeout (float): The timeout in seconds for each request.
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "Executor":
+        self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def open(self) -> None:
+        """
+        Create the shared client and the concurrency slots if they don't exist yet.
+        """
+        if self._client is not None:
+            return
+        # httpx takes longer to import than the rest of the engine, so a run only
+        # pays for it once it is about to send something.
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency,
+            keepalive_expiry=execution_constants.DEFAULT_KEEPALIVE_EXPIRY,
+        )
+        self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    async def close(self) -> None:
+        """
+        Close the shared client and every pooled connection.
+        """
+        if self._client is None:
+            return
+        await self._client.aclose()
+        self._client = None
+        self._slots = None
+
+    async def send(
+        self,
+        request: PreparedRequest,
+        index: int = 0,
+        options: Optional[RunOptions] = None,
+    ) -> ExecutionResult:
+        """
+        Send a single request through the shared client.
+
+        The response is streamed, so its body is never held in memory: it is
+        written to disk if the options capture it, and discarded otherwise.
+        If the options project it, the requested fields are extracted from the
+        chunks as they arrive. Transport errors are captured in the result
+        rather than raised, as are failures to get an OAuth token or to write
+        the body. A body that isn't valid JSON gets the parse error as its projection.
+
+        Args:
+            request (PreparedRequest): The request to send.
+            index (int): The position of the request in its run.
+            options (RunOptions, optional): The status codes, OAuth credentials, latency,
+                body capture and projection to apply.
+
+        Returns:
+            ExecutionResult: The outcome of the request.
+        """
+        import httpx
+
+        self.open()
+        options = options if options is not None else DEFAULT_RUN_OPTIONS
+        credentials = options.credentials
+        bodies = options.bodies
+        start = time.perf_counter()
+        headers = request.headers
+        if credentials is not None:
+            try:
+                access_token = await tokens.token(self._client, credentials)
+            except OAuthError as e:
+                return ExecutionResult(index, None, time.perf_counter() - start, str(e))
+            headers = {**headers, "Authorization": f"Bearer {access_token}"}
+        timer = PhaseTimer() if options.latency else None
+        projector = options.projection.start() if options.projection is not None else None
+        body = None
+        try:
+            async with self._client.stream(
+                request.method,
+                request.url,
+                headers=headers,
+                content=request.content,
+                extensions={"trace": timer} if timer is not None else None,
+            ) as response:
+                if bodies is not None and bodies.should_capture(index):
+                    body = await bodies.capture(index, response, projector)
+                elif projector is not None:
+                    async for chunk in response.aiter_bytes():
+                        projector.feed(chunk)
+                else:
+                    async for _ in response.aiter_raw():
+                        pass
+        except (httpx.HTTPError, OSError) as e:
+            return ExecutionResult(index, None, time.perf_counter() - start, repr(e))
+        elapsed = time.perf_counter() - start
+        status_code = response.status_code
+        if credentials is not None and status_code == 401:
+            tokens.invalidate(credentials, access_token)
+        projection = None
+        if projector is not None:
+            try:
+                projection = projector.close()
+            except ValueError as e:
+                projection = {"error": str(e)}
+        return ExecutionResult(
+            index,
+            status_code,
+            elapsed,
+            ok=options.status_codes.is_success(status_code),
+            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            phases=timer.phases(elapsed) if timer is not None else None,
+            body=body,
+            projection=projection,
+        )
+
+    async def run(
+        self,
+        config: "Config",
+        rows: Union[VariableFeed, Iterable[Mapping[str, str]], None] = None,
+        repeat: int = 1,
+        on_result: Optional[Callable[[ExecutionResult], None]] = None,
+        secrets: Optional[SecretResolver] = None,
+        shard: Shard = WHOLE,
+        stamp: Optional[str] = None,
+    ) -> RunSummary:
+        """
+        Execute a config once per input row, or a number of times if there are no rows.
+
+        The config's templates are compiled once up front, so each row only
+        costs a render. Rows are pulled one at a time as slots free up, so a
+        feed is never read further ahead than the requests in flight. The
+        secrets referenced by the config are read once, before the first request.
+
+        Args:
+            config (Config): The config to execute.
+            rows (VariableFeed | Iterable[Mapping[str, str]], optional): The variable values
+                for each request.
+            repeat (int): How many times to send the request when no rows are given.
+            on_result (Callable): Called with each result as it completes.
+            secrets (SecretResolver, optional): Resolves the referenced secrets, a new
+                resolver for this run by default.
+            shard (Shard): Only send the rows and repeats of this shard of the run, under
+                their index in the whole run.
+            stamp (str, optional): Names the files of the run, shared by its shards, a
+                new `run_stamp` by default.
+
+        Raises:
+            ValueError: If the config's status codes can't be parsed, or it references a
+                secret that does not exist.
+
+        Returns:
+            RunSummary: The counters for the run.
+        """
+        secrets = secrets if secrets is not None else SecretResolver()
+        # The unique log and the bodies directory are named after the same stamp.
+        stamp = stamp if stamp is not None else run_stamp()
+        if config.auth_enabled:
+            await secrets.prefetch(config.auth_details.values())
+        options = RunOptions.from_config(config, secrets, stamp)
+        options.shard = shard
+        requests = config_requests(config, secrets, rows, repeat, shard)
+        options.logger = RunLogger.from_config(config, stamp, shard)
+        return await self.run_requests(requests, on_result, options)
+
+    async def run_requests(
+        self,
+        requests: Iterable[PreparedRequest],
+        on_result: Optional[Callable[[ExecutionResult], None]] = None,
+        options: Optional[RunOptions] = None,
+    ) -> RunSummary:
+        """
+        Send every request from an iterable, keeping at most `concurrency` in flight.
+
+        The iterable is only advanced once a slot is free, so a lazy iterable is
+        never read further ahead than the requests that are actually running.
+
+        A request waiting to be retried gives its slot back while it sleeps and
+        queues for a slot again when its backoff is over. Rate limited requests
+        wait for their token in their own task before taking a slot, for the
+        same reason, so a throttled host doesn't hold up requests to the
+        others. At most `concurrency` requests wait for a token at once.
+
+        Results are handed to the options' disk logger, which is closed, after
+        logging the summary, once every request has completed. If the iterable
+        or a request raises, the requests still in flight are cancelled before
+        the logger is closed and the error is raised.
+
+        Args:
+            requests (Iterable[PreparedRequest]): The requests to send.
+            on_result (Callable): Called with each result as it completes.
+            options (RunOptions, optional): The status codes, retries, rate limit and logs
+                to apply.
+
+        Returns:
+            RunSummary: The counters for the run.
+        """
+        self.open()
+        options = options if options is not None else DEFAULT_RUN_OPTIONS
+        rate_limiter = options.rate_limiter
+        shard = options.shard
+        summary = RunSummary(latency=options.latency)
+        pending: set[asyncio.Task] = set()
+        throttled = asyncio.Semaphore(self.concurrency) if rate_limiter is not None else None
+        failures: list[BaseException] = []
+
+        def completed(task: asyncio.Task) -> None:
+            pending.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                failures.append(task.exception())
+
+        try:
+            for position, request in enumerate(requests):
+                if failures:
+                    break
+                index = shard.position_of(position)
+                if throttled is not None:
+                    await throttled.acquire()
+                else:
+                    await self._slots.acquire()
+                task = asyncio.create_task(
+                    self._execute(request, index, summary, on_result, options, throttled)
+                )
+                pending.add(task)
+                task.add_done_callback(completed)
+
+            if pending:
+                await asyncio.gather(*pending)
+            if failures:
+                raise failures[0]
+            summary.finish()
+        finally:
+            if pending:
+                # The requests still in flight when reading the requests or one of
+                # them failed. Every task gets to start first, so that those that
+                # were handed a slot give it back when cancelled.
+                await asyncio.sleep(0)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            if options.logger is not None:
+                await asyncio.to_thread(options.logger.close, summary)
+        return summary
+
+    async def _execute(
+        self,
+        request: PreparedRequest,
+        index: int,
+        summary: RunSummary,
+        on_result: Optional[Callable[[ExecutionResult], None]],
+        options: RunOptions,
+        throttled: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        retry_policy = options.retry_policy
+        rate_limiter = options.rate_limiter
+        if throttled is not None:
+            # Dispatched without a slot, which is only taken once the token is.
+            try:
+                await rate_limiter.wait(request.url)
+            finally:
+                throttled.release()
+            await self._slots.acquire()
+        attempt = 0
+        while True:
+            try:
+                result = await self.send(request, index, options)
+            finally:
+                self._slots.release()
+            if retry_policy is None or not retry_policy.should_retry(
+                result.ok, result.status_code, attempt
+            ):
+                break
+            await asyncio.sleep(retry_policy.delay(attempt, result.retry_after))
+            attempt += 1
+            if rate_limiter is not None:
+                await rate_limiter.wait(request.url)
+            await self._slots.acquire()
+
+        if attempt:
+            result = result._replace(attempts=attempt + 1)
+        summary.record(result)
+        if options.logger is not None:
+            options.logger(result)
+        if on_result is not None:
+            on_result(result)
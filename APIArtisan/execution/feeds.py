@@ -0,0 +1,196 @@
+import csv
+import json
+import mmap
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator, Mapping, NamedTuple, Optional, Sequence
+
+
+@contextmanager
+def open_lines(path: str) -> Iterator[Iterator[bytes]]:
+    """
+    Open a file as an iterator of raw lines, memory-mapped when the file allows it.
+
+    Mapping lets the OS page the file in and out as it is read, so only the
+    lines currently being consumed are resident. Empty files and files that
+    can't be mapped (pipes, some network drives) fall back to buffered reads.
+
+    Args:
+        path (str): The path of the file to read.
+
+    Yields:
+        Iterator[bytes]: The lines of the file, including their line endings.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mapped = None
+        if mapped is None:
+            yield iter(f)
+            return
+        try:
+            yield iter(mapped.readline, b"")
+        finally:
+            mapped.close()
+
+
+class Shard(NamedTuple):
+    """
+    One of `count` interleaved parts of a run, made of the rows and requests
+    at positions `index`, `index + count`, `index + 2 * count` and so on.
+    """
+
+    index: int
+    count: int
+
+    def owns(self, position: int) -> bool:
+        return position % self.count == self.index
+
+    def position_of(self, local_position: int) -> int:
+        """
+        The position in the whole run of the shard's `local_position`-th row or request.
+        """
+        return self.index + local_position * self.count
+
+
+WHOLE = Shard(0, 1)
+
+
+class VariableFeed(ABC):
+    """
+    A lazily read source of variable values, one row per request.
+
+    Rows are produced by a generator, so a row is only read from disk when the
+    executor has a free slot to send it. The file is never held in memory.
+    """
+
+    def __init__(self, path: str, columns: Optional[Mapping[str, str]] = None):
+        """
+        Initializes a VariableFeed object.
+
+        Args:
+            path (str): The path of the file to stream.
+            columns (Mapping[str, str], optional): Maps file columns to variable names,
+                columns not listed are matched to variables of the same name.
+        """
+        self.path = path
+        self.columns = dict(columns) if columns else {}
+
+    def variable_for(self, column: str) -> str:
+        return self.columns.get(column, column)
+
+    def missing(self, available: Sequence[str], variables: Sequence[str]) -> list[str]:
+        provided = {self.variable_for(column) for column in available}
+        return [variable for variable in variables if variable not in provided]
+
+    @abstractmethod
+    def rows(self, variables: Sequence[str], shard: Shard = WHOLE) -> Iterator[tuple[str, ...]]:
+        """
+        Stream the values of the given variables, one tuple per row.
+
+        Args:
+            variables (Sequence[str]): The variables to read, in the order to return them.
+            shard (Shard): Only the rows of this shard are returned, the others are
+                skipped without being converted.
+
+        Raises:
+            ValueError: If the file doesn't provide one of the variables.
+
+        Yields:
+            tuple[str, ...]: The values of one row, ordered like `variables`.
+        """
+        pass
+
+
+class CsvFeed(VariableFeed):
+    def __init__(
+        self,
+        path: str,
+        columns: Optional[Mapping[str, str]] = None,
+        encoding: str = "utf-8-sig",
+    ):
+        super().__init__(path, columns)
+        self.encoding = encoding
+
+    def rows(self, variables: Sequence[str], shard: Shard = WHOLE) -> Iterator[tuple[str, ...]]:
+        encoding = self.encoding
+        with open_lines(self.path) as lines:
+            reader = csv.reader(line.decode(encoding) for line in lines)
+            header = next(reader, None)
+            if header is None:
+                return
+            missing = self.missing(header, variables)
+            if missing:
+                raise ValueError(f"{self.path} has no column for {', '.join(missing)}")
+
+            positions = {self.variable_for(column): i for i, column in enumerate(header)}
+            indexes = [positions[variable] for variable in variables]
+            position = -1
+            for record in reader:
+                if not record:
+                    continue
+                position += 1
+                if not shard.owns(position):
+                    continue
+                try:
+                    yield tuple(record[i] for i in indexes)
+                except IndexError:
+                    raise ValueError(
+                        f"{self.path}:{reader.line_num}: expected {len(header)} columns, "
+                        f"got {len(record)}"
+                    ) from None
+
+
+class JsonlFeed(VariableFeed):
+    def rows(self, variables: Sequence[str], shard: Shard = WHOLE) -> Iterator[tuple[str, ...]]:
+        keys: Optional[list[str]] = None
+        position = -1
+        with open_lines(self.path) as lines:
+            for line_number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                position += 1
+                if not shard.owns(position):
+                    continue
+                record = json.loads(line)
+                if keys is None:
+                    by_variable = {self.variable_for(key): key for key in record}
+                    missing = [variable for variable in variables if variable not in by_variable]
+                    if missing:
+                        raise ValueError(f"{self.path} has no key for {', '.join(missing)}")
+                    keys = [by_variable[variable] for variable in variables]
+                try:
+                    yield tuple(str(record[key]) for key in keys)
+                except KeyError as e:
+                    raise ValueError(f"{self.path}:{line_number} is missing {e}") from None
+
+
+FEED_TYPES: dict[str, type[VariableFeed]] = {
+    ".csv": CsvFeed,
+    ".jsonl": JsonlFeed,
+    ".ndjson": JsonlFeed,
+}
+
+
+def open_feed(path: str, columns: Optional[Mapping[str, str]] = None) -> VariableFeed:
+    """
+    Create the feed for a file based on its extension.
+
+    Args:
+        path (str): The path of a .csv, .jsonl or .ndjson file.
+        columns (Mapping[str, str], optional): Maps file columns to variable names.
+
+    Raises:
+        ValueError: If the extension is not supported.
+
+    Returns:
+        VariableFeed: The feed for the file.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        feed_type = FEED_TYPES[extension]
+    except KeyError:
+        raise ValueError(f"Unsupported variable feed {path}, expected .csv or .jsonl") from None
+    return feed_type(path, columns)
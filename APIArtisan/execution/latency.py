@@ -0,0 +1,246 @@
+import math
+import time
+from array import array
+from typing import NamedTuple, Optional
+
+from ..constants import execution_constants
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+# The trace events of httpcore marking the start and end of each phase,
+# mapped to their position in `PhaseTimer.marks`.
+TRACE_MARKS = {
+    "connection.connect_tcp.started": 0,
+    "connection.connect_tcp.complete": 1,
+    "connection.start_tls.started": 2,
+    "connection.start_tls.complete": 3,
+    "http11.send_request_headers.started": 4,
+    "http2.send_request_headers.started": 4,
+    "http11.receive_response_headers.complete": 5,
+    "http2.receive_response_headers.complete": 5,
+    "http11.receive_response_body.started": 6,
+    "http2.receive_response_body.started": 6,
+    "http11.receive_response_body.complete": 7,
+    "http2.receive_response_body.complete": 7,
+}
+
+
+class Phases(NamedTuple):
+    """
+    The time in seconds spent in each phase of one request.
+
+    Connect includes resolving the host name, which happens inside the
+    connection call. Connect and TLS are zero when a pooled connection was reused.
+    """
+
+    connect: float
+    tls: float
+    ttfb: float
+    body: float
+    total: float
+
+
+PHASES = Phases._fields
+
+
+class PhaseTimer:
+    """
+    Collects the phase timestamps of one request from httpcore's trace extension.
+
+    The async client only accepts a coroutine function as its trace callback.
+    """
+
+    __slots__ = ("marks",)
+
+    def __init__(self):
+        self.marks = [0.0] * 8
+
+    async def __call__(self, event_name: str, info: dict) -> None:
+        position = TRACE_MARKS.get(event_name)
+        if position is not None:
+            self.marks[position] = time.perf_counter()
+
+    def phases(self, total: float) -> Phases:
+        """
+        Args:
+            total (float): The seconds the whole request took.
+
+        Returns:
+            Phases: The time spent in each phase.
+        """
+        marks = self.marks
+        now = time.perf_counter()
+        return Phases(
+            _span(marks[0], marks[1], now),
+            _span(marks[2], marks[3], now),
+            _span(marks[4], marks[5], now),
+            _span(marks[6], marks[7], now),
+            total,
+        )
+
+
+def _span(start: float, end: float, now: float) -> float:
+    # A phase that started but never completed, such as a body read that was
+    # cut short, lasted until the request was over.
+    if not start:
+        return 0.0
+    return (end if end >= start else now) - start
+
+
+class LatencyHistogram:
+    """
+    A fixed-size histogram of durations with a bounded relative error.
+
+    Durations are counted in microseconds, in buckets laid out like an HDR
+    histogram: exact below `2 ** precision_bits`, then each power of two
+    split in `2 ** (precision_bits - 1)` buckets, which keeps the error below
+    one part in `2 ** (precision_bits - 1)`. The counts are allocated once, so
+    recording a value is a few integer operations and an increment in place.
+    """
+
+    __slots__ = ("precision_bits", "max_value", "counts", "count", "total", "min", "max")
+
+    def __init__(
+        self,
+        precision_bits: int = execution_constants.LATENCY_PRECISION_BITS,
+        max_seconds: float = execution_constants.LATENCY_MAX_SECONDS,
+    ):
+        """
+        Initializes a LatencyHistogram object.
+
+        Args:
+            precision_bits (int): The bits of precision kept, 8 for an error under 0.8%.
+            max_seconds (float): The largest duration tracked, longer ones count as this.
+        """
+        self.precision_bits = precision_bits
+        self.max_value = int(max_seconds * 1_000_000)
+        self.counts = array("Q", bytes(8 * (self._index(self.max_value) + 1)))
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        bits = self.precision_bits
+        shift = value.bit_length() - bits
+        if shift <= 0:
+            return value
+        half = 1 << (bits - 1)
+        return (shift + 1) * half + (value >> shift) - half
+
+    def _lowest(self, index: int) -> int:
+        bits = self.precision_bits
+        half = 1 << (bits - 1)
+        if index < 2 * half:
+            return index
+        shift = index // half - 1
+        return (index - shift * half) << shift
+
+    def record(self, seconds: float) -> None:
+        """
+        Count one duration.
+
+        Args:
+            seconds (float): The duration in seconds.
+        """
+        value = int(seconds * 1_000_000)
+        if value > self.max_value:
+            value = self.max_value
+        elif value < 0:
+            value = 0
+        self.counts[self._index(value)] += 1
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add the counts of a histogram with the same layout to this one.
+        """
+        if other.precision_bits != self.precision_bits or other.max_value != self.max_value:
+            raise ValueError("Only histograms with the same precision and range can be merged")
+        if not other.count:
+            return
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def reset(self) -> None:
+        """
+        Forget every value counted, keeping the allocated counts.
+        """
+        if self.count:
+            memoryview(self.counts).cast("B")[:] = bytes(len(self.counts) * 8)
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Args:
+            percentile (float): The percentile to get, between 0 and 100.
+
+        Returns:
+            float: The duration in seconds below which that percentage of the values fall.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percentile / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._lowest(index + 1) - 1, self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    def mean(self) -> float:
+        return self.total / self.count / 1_000_000 if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        """
+        Summarize the histogram in milliseconds.
+
+        Returns:
+            dict: The count, mean, p50, p90, p99, p99.9 and max.
+        """
+        summary = {"count": self.count, "mean": round(self.mean() * 1000, 3)}
+        for percentile in PERCENTILES:
+            summary[f"p{percentile:g}"] = round(self.percentile(percentile) * 1000, 3)
+        summary["max"] = round(self.max / 1000, 3)
+        return summary
+
+
+class LatencyRecorder:
+    """
+    One histogram per phase for the requests of a run.
+
+    Phases that didn't happen, such as connecting on a reused connection,
+    are not counted, so their histograms describe the requests that had them.
+    """
+
+    def __init__(self):
+        self.histograms = {phase: LatencyHistogram() for phase in PHASES}
+        self._ordered = tuple(self.histograms.values())
+
+    def record(self, phases: Optional[Phases]) -> None:
+        if phases is None:
+            return
+        for histogram, seconds in zip(self._ordered, phases):
+            if seconds > 0:
+                histogram.record(seconds)
+
+    def merge(self, other: "LatencyRecorder") -> None:
+        for phase, histogram in self.histograms.items():
+            histogram.merge(other.histograms[phase])
+
+    def to_dict(self) -> dict:
+        return {phase: histogram.to_dict() for phase, histogram in self.histograms.items()}
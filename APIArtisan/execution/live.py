@@ -0,0 +1,129 @@
+import time
+from collections import deque
+from typing import TYPE_CHECKING, NamedTuple
+
+from ..constants import execution_constants
+from .latency import LatencyHistogram
+
+if TYPE_CHECKING:
+    from .engine import ExecutionResult
+
+
+class SecondStats(NamedTuple):
+    """
+    The aggregate of the requests that completed during one second of a run,
+    with the latency percentiles of their responses in milliseconds.
+    """
+
+    second: int
+    requests: int
+    errors: int
+    p50: float
+    p90: float
+    p99: float
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests * 100 if self.requests else 0.0
+
+
+class LiveStats:
+    """
+    Per-second aggregates of a run in progress, kept in a fixed-size ring buffer.
+
+    A result only bumps the counters and the latency histogram of the
+    current second. Once the second is over its percentiles are read once,
+    the aggregate goes into the ring buffer, pushing the oldest second out
+    when it is full, and the histogram is reset for the next second. Memory
+    stays the same however long the run or however many requests it sends,
+    and a reader only ever asks for the seconds it hasn't seen yet.
+    """
+
+    def __init__(self, capacity: int = execution_constants.LIVE_HISTORY_SECONDS):
+        """
+        Initializes a LiveStats object, the run starting now.
+
+        Args:
+            capacity (int): How many of the latest seconds are kept.
+        """
+        self.seconds: deque[SecondStats] = deque(maxlen=capacity)
+        self.started = time.perf_counter()
+        self.finished = False
+        self.total = 0
+        self.errors = 0
+        self._second = 0
+        self._requests = 0
+        self._errors = 0
+        self._histogram = LatencyHistogram()
+
+    def record(self, result: "ExecutionResult") -> None:
+        """
+        Count a single result in the second it completed. Usable as a run's `on_result`.
+
+        The latency of a load test's request is counted from when it was due.
+        """
+        second = int(time.perf_counter() - self.started)
+        if second != self._second:
+            self._close(second)
+        self._requests += 1
+        self.total += 1
+        if not result.ok:
+            self._errors += 1
+            self.errors += 1
+        if result.error is None:
+            corrected = result.corrected
+            self._histogram.record(corrected if corrected is not None else result.elapsed)
+
+    def roll(self) -> None:
+        """
+        Close the seconds that are over, including those in which nothing completed.
+        """
+        if self.finished:
+            return
+        second = int(time.perf_counter() - self.started)
+        if second != self._second:
+            self._close(second)
+
+    def finish(self) -> None:
+        """
+        Close the last, partial, second of the run.
+        """
+        if not self.finished:
+            self._close(self._second + 1)
+            self.finished = True
+
+    def since(self, second: int) -> list[SecondStats]:
+        """
+        Args:
+            second (int): The last second already seen, -1 for none.
+
+        Returns:
+            list[SecondStats]: The closed seconds after it still in the buffer, oldest first.
+        """
+        seconds = []
+        for stats in reversed(self.seconds):
+            if stats.second <= second:
+                break
+            seconds.append(stats)
+        seconds.reverse()
+        return seconds
+
+    def _close(self, second: int) -> None:
+        histogram = self._histogram
+        self.seconds.append(
+            SecondStats(
+                self._second,
+                self._requests,
+                self._errors,
+                round(histogram.percentile(50) * 1000, 3),
+                round(histogram.percentile(90) * 1000, 3),
+                round(histogram.percentile(99) * 1000, 3),
+            )
+        )
+        # Seconds in which nothing completed, no more of them than the buffer holds.
+        for empty in range(max(self._second + 1, second - self.seconds.maxlen), second):
+            self.seconds.append(SecondStats(empty, 0, 0, 0.0, 0.0, 0.0))
+        self._second = second
+        self._requests = 0
+        self._errors = 0
+        histogram.reset()
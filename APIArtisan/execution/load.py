@@ -0,0 +1,266 @@
+import asyncio
+import math
+import time
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from ..models.load_config import LoadConfig, LoadProfile
+from ..utils.secret_resolver import SecretResolver
+from .engine import ExecutionResult, Executor, RunOptions, RunSummary, config_requests
+from .feeds import VariableFeed
+from .logs import RunLogger, run_stamp
+from .request import PreparedRequest
+
+if TYPE_CHECKING:
+    from ..models.config import Config
+
+
+class Stage(NamedTuple):
+    """
+    A stretch of a load test over which the arrival rate, in requests per second,
+    changes linearly from `start_rate` to `end_rate`.
+    """
+
+    duration: float
+    start_rate: float
+    end_rate: float
+
+
+class ArrivalSchedule:
+    """
+    When each request of a load test is due, for an arrival rate made of linear stages.
+
+    The n-th request is due when the expected number of arrivals, the
+    integral of the rate, reaches n, starting from the first at zero. Within a
+    stage that integral is a quadratic, so each due time is solved for
+    directly rather than stepped towards, and the fraction of a request left
+    at the end of a stage carries over into the next one.
+    """
+
+    def __init__(self, stages: Iterable[Stage]):
+        """
+        Initializes an ArrivalSchedule object.
+
+        Args:
+            stages (Iterable[Stage]): The stages of the test, in order.
+
+        Raises:
+            ValueError: If a stage has a negative duration or rate.
+        """
+        self.stages = tuple(stages)
+        for stage in self.stages:
+            if min(stage) < 0:
+                raise ValueError("Stage durations and rates can't be negative")
+
+    @classmethod
+    def from_config(cls, load: LoadConfig) -> "ArrivalSchedule":
+        """
+        Build the schedule of a config's load profile.
+
+        A constant profile sends `rate` requests per second for the whole
+        duration, and a ramp goes linearly from `rate` to `peak_rate`. A step
+        profile climbs from `rate` to `peak_rate` in `steps` stages of equal
+        length. A spike profile sends `rate` requests per second apart from
+        `spike_duration` seconds at `peak_rate`, starting `spike_at` seconds in.
+
+        Args:
+            load (LoadConfig): The config's load test settings.
+
+        Returns:
+            ArrivalSchedule: The schedule.
+        """
+        rate, peak_rate, duration = load.rate, load.peak_rate, load.duration
+        match load.profile:
+            case LoadProfile.RAMP:
+                stages = [Stage(duration, rate, peak_rate)]
+            case LoadProfile.STEP:
+                steps = max(1, load.steps)
+                increment = (peak_rate - rate) / (steps - 1) if steps > 1 else 0.0
+                stages = [
+                    Stage(duration / steps, rate + step * increment, rate + step * increment)
+                    for step in range(steps)
+                ]
+            case LoadProfile.SPIKE:
+                spike_start = min(load.spike_at, duration)
+                spike_end = min(load.spike_at + load.spike_duration, duration)
+                stages = [
+                    Stage(spike_start, rate, rate),
+                    Stage(spike_end - spike_start, peak_rate, peak_rate),
+                    Stage(duration - spike_end, rate, rate),
+                ]
+            case _:
+                stages = [Stage(duration, rate, rate)]
+        return cls(stages)
+
+    def offsets(self) -> Iterator[float]:
+        """
+        The seconds from the start of the test at which each request is due, in order.
+        """
+        started = 0.0
+        arrived = 0.0
+        arrival = 0
+        for duration, start_rate, end_rate in self.stages:
+            if duration <= 0:
+                continue
+            slope = (end_rate - start_rate) / duration
+            expected = duration * (start_rate + end_rate) / 2
+            while arrival - arrived < expected:
+                count = arrival - arrived
+                # The root of slope / 2 * t ** 2 + start_rate * t = count, in a form that
+                # stays accurate when the slope is close to zero.
+                root = math.sqrt(max(0.0, start_rate * start_rate + 2 * slope * count))
+                yield started + (2 * count / (start_rate + root) if count else 0.0)
+                arrival += 1
+            arrived += expected
+            started += duration
+
+
+async def run_load(
+    executor: Executor,
+    config: "Config",
+    rows: Union[VariableFeed, Iterable[Mapping[str, str]], None] = None,
+    on_result: Optional[Callable[[ExecutionResult], None]] = None,
+    secrets: Optional[SecretResolver] = None,
+    schedule: Optional[ArrivalSchedule] = None,
+) -> RunSummary:
+    """
+    Execute a config as an open-model load test, following its load profile.
+
+    Each request is started at the time the profile schedules it, whether
+    or not the earlier ones have completed, so a server that slows down gets
+    more requests in flight instead of fewer requests. Its latency is counted
+    from that time too, in the corrected latency of the summary: a request
+    started late because the client fell behind, or that waited for a pooled
+    connection, still counts the time it should have been in flight. A closed
+    loop, which only sends once a response came back, leaves exactly those
+    delays out of its latencies.
+
+    The config's Retries and Status codes apply as in any other run, and the
+    backoff of a retried request is part of its latency. Its rate limit
+    doesn't, as the profile sets the rate. The executor's concurrency caps the
+    pooled connections, and the config's `max_in_flight` the requests in
+    flight: a request due while that many are still running is not sent, and
+    counts as an error. If reading the requests or a request raises, those
+    still in flight are cancelled before the error is raised.
+
+    Args:
+        executor (Executor): Sends the requests.
+        config (Config): The config to execute.
+        rows (VariableFeed | Iterable[Mapping[str, str]], optional): The variable values
+            for each request, the test ends early if they run out.
+        on_result (Callable): Called with each result as it completes.
+        secrets (SecretResolver, optional): Resolves the referenced secrets, a new
+            resolver for this run by default.
+        schedule (ArrivalSchedule, optional): When to send each request, the config's
+            load profile by default.
+
+    Raises:
+        ValueError: If the config's status codes can't be parsed, or it references a
+            secret that does not exist.
+
+    Returns:
+        RunSummary: The counters and corrected latency of the test, and the latency of
+            each phase if the config's output asks for it.
+    """
+    secrets = secrets if secrets is not None else SecretResolver()
+    stamp = run_stamp()
+    if config.auth_enabled:
+        await secrets.prefetch(config.auth_details.values())
+    options = RunOptions.from_config(config, secrets, stamp)
+    options.rate_limiter = None
+    schedule = schedule if schedule is not None else ArrivalSchedule.from_config(config.load)
+    requests = config_requests(config, secrets, rows, repeat=None)
+    max_in_flight = config.load.max_in_flight
+    options.logger = RunLogger.from_config(config, stamp)
+    executor.open()
+    summary = RunSummary(latency=options.latency)
+    pending: set[asyncio.Task] = set()
+    failures: list[BaseException] = []
+
+    def completed(task: asyncio.Task) -> None:
+        pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            failures.append(task.exception())
+
+    try:
+        start = time.perf_counter()
+        for index, offset in enumerate(schedule.offsets()):
+            if failures:
+                break
+            request = next(requests, None)
+            if request is None:
+                break
+            intended = start + offset
+            # This yields to the requests in flight even when the test is behind schedule.
+            await asyncio.sleep(intended - time.perf_counter())
+            if len(pending) >= max_in_flight:
+                result = ExecutionResult(
+                    index, None, 0.0, f"Not sent, {max_in_flight} requests already in flight"
+                )
+                _complete(result, summary, on_result, options)
+                continue
+            task = asyncio.create_task(
+                _execute(executor, request, index, intended, summary, on_result, options)
+            )
+            pending.add(task)
+            task.add_done_callback(completed)
+
+        if pending:
+            await asyncio.gather(*pending)
+        if failures:
+            raise failures[0]
+        summary.finish()
+    finally:
+        # The requests still in flight when reading the requests or one of them failed.
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if options.logger is not None:
+            await asyncio.to_thread(options.logger.close, summary)
+    return summary
+
+
+async def _execute(
+    executor: Executor,
+    request: PreparedRequest,
+    index: int,
+    intended: float,
+    summary: RunSummary,
+    on_result: Optional[Callable[[ExecutionResult], None]],
+    options: RunOptions,
+) -> None:
+    retry_policy = options.retry_policy
+    attempt = 0
+    while True:
+        result = await executor.send(request, index, options)
+        if retry_policy is None or not retry_policy.should_retry(
+            result.ok, result.status_code, attempt
+        ):
+            break
+        await asyncio.sleep(retry_policy.delay(attempt, result.retry_after))
+        attempt += 1
+
+    result = result._replace(attempts=attempt + 1, corrected=time.perf_counter() - intended)
+    _complete(result, summary, on_result, options)
+
+
+def _complete(
+    result: ExecutionResult,
+    summary: RunSummary,
+    on_result: Optional[Callable[[ExecutionResult], None]],
+    options: RunOptions,
+) -> None:
+    summary.record(result)
+    if options.logger is not None:
+        options.logger(result)
+    if on_result is not None:
+        on_result(result)
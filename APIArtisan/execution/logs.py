@@ -0,0 +1,328 @@
+import gzip
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Optional
+
+import orjson
+
+from ..constants import execution_constants, storage_constants
+from ..models.output_config import OutputConfig, OutputOption
+from .feeds import WHOLE, Shard
+
+if TYPE_CHECKING:
+    from ..models.config import Config
+    from .engine import ExecutionResult, RunSummary
+
+
+_stamp_lock = threading.Lock()
+_last_stamp = datetime.min
+
+
+def run_stamp() -> str:
+    """
+    The timestamp naming the files of a run, shared by every shard of the run.
+
+    It goes down to the microsecond and ends with the process id, and the stamps
+    of a process always increase even if the clock hasn't moved, so two runs never
+    share their files.
+    """
+    global _last_stamp
+    with _stamp_lock:
+        now = max(datetime.now(), _last_stamp + timedelta(microseconds=1))
+        _last_stamp = now
+    return f"{now:%Y%m%d-%H%M%S-%f}-{os.getpid()}"
+
+
+class DiskLog:
+    """
+    An append-only log file written by its own thread.
+
+    Writing a record only appends it to a bounded ring buffer, which is all
+    the event loop ever does. The writer thread wakes up when a batch has
+    built up or every flush interval, formats everything buffered, and
+    writes it with a single call. When the buffer is full the oldest records
+    are dropped and counted rather than slowing down the requests.
+
+    The file is rotated once it grows past `max_bytes` or gets older than
+    `max_age`, the rotated segment being renamed with a timestamp and
+    optionally gzipped.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = execution_constants.LOG_MAX_BYTES,
+        max_age: float = execution_constants.LOG_MAX_AGE,
+        compress: bool = execution_constants.LOG_COMPRESS,
+        capacity: int = execution_constants.LOG_BUFFER_SIZE,
+        batch_size: int = execution_constants.LOG_BATCH_SIZE,
+        flush_interval: float = execution_constants.LOG_FLUSH_INTERVAL,
+    ):
+        """
+        Initializes a DiskLog object and starts its writer thread.
+
+        Args:
+            path (str): The file to append to, its directory is created if needed.
+            max_bytes (int): The size after which the file is rotated.
+            max_age (float): The seconds after which the file is rotated.
+            compress (bool): Whether to gzip rotated segments.
+            capacity (int): The most records buffered before the oldest are dropped.
+            batch_size (int): How many buffered records wake the writer before the interval.
+            flush_interval (float): The most seconds a record waits before being written.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._buffer: deque[tuple[Callable[..., bytes], tuple]] = deque(maxlen=capacity)
+        self._wake = threading.Event()
+        self._closed = False
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._thread = threading.Thread(
+            target=self._run, name=f"disk-log-{os.path.basename(path)}", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, formatter: Callable[..., bytes], *args) -> None:
+        """
+        Buffer a record, formatted on the writer thread by calling `formatter(*args)`.
+
+        Args:
+            formatter (Callable[..., bytes]): Turns the arguments into a line of the log.
+        """
+        buffer = self._buffer
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append((formatter, args))
+        if len(buffer) >= self.batch_size and not self._wake.is_set():
+            self._wake.set()
+
+    def close(self) -> None:
+        """
+        Write everything still buffered and stop the writer thread. This blocks.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closed = self._closed
+            self._drain()
+            if closed:
+                break
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _drain(self) -> None:
+        buffer = self._buffer
+        chunks = []
+        while True:
+            try:
+                formatter, args = buffer.popleft()
+            except IndexError:
+                break
+            try:
+                chunks.append(formatter(*args))
+            except Exception as e:
+                print(f"Could not format a record for {self.path}: {e!r}", file=sys.stderr)
+        if not chunks:
+            return
+        data = b"".join(chunks)
+        try:
+            self._open_for(len(data))
+            self._file.write(data)
+            self._file.flush()
+        except OSError as e:
+            print(f"Could not write to {self.path}: {e!r}", file=sys.stderr)
+            return
+        self._size += len(data)
+
+    def _open_for(self, length: int) -> None:
+        if self._file is not None:
+            too_big = self._size and self._size + length > self.max_bytes
+            too_old = time.time() - self._opened_at >= self.max_age
+            if not (too_big or too_old):
+                return
+            self._file.close()
+            self._file = None
+            self._rotate()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "ab", buffering=execution_constants.LOG_WRITE_BUFFER)
+        self._size = self._file.tell()
+        self._opened_at = time.time()
+
+    def _rotate(self) -> None:
+        stem, extension = os.path.splitext(self.path)
+        segment = f"{stem}.{datetime.now():%Y%m%d-%H%M%S-%f}{extension}"
+        os.replace(self.path, segment)
+        if not self.compress:
+            return
+        with open(segment, "rb") as source, gzip.open(f"{segment}.gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(segment)
+
+
+class RunLogger:
+    """
+    Sends the results of one config's run to the disk logs its output settings ask for.
+
+    The generic log is shared by every run of the process, while the unique
+    log is a new file per run under the config's own log directory. Each
+    shard of a run in several processes logs to its own unique file, and
+    logs the summary of its own requests.
+    """
+
+    def __init__(
+        self,
+        config_name: str,
+        output: OutputConfig,
+        generic: Optional[DiskLog] = None,
+        unique: Optional[DiskLog] = None,
+        shard: Shard = WHOLE,
+    ):
+        self.config_name = config_name
+        self.shard = shard
+        self.status_code = output.is_enabled(OutputOption.STATUS_CODE)
+        self.latency = output.is_enabled(OutputOption.LATENCY)
+        self.generic = generic
+        self.unique = unique
+
+    @classmethod
+    def from_config(
+        cls, config: "Config", stamp: Optional[str] = None, shard: Shard = WHOLE
+    ) -> Optional["RunLogger"]:
+        """
+        Open the logs of a config's run.
+
+        Args:
+            config (Config): The config being run.
+            stamp (str, optional): Names the unique log, see `run_stamp`.
+            shard (Shard): The part of the run logged.
+
+        Returns:
+            RunLogger | None: The logger, or None if the config doesn't log to disk.
+        """
+        output = config.output
+        generic = shared_log() if output.is_enabled(OutputOption.GENERIC_DISK_LOG) else None
+        unique = None
+        if output.is_enabled(OutputOption.UNIQUE_DISK_LOG):
+            file_name = stamp if stamp is not None else run_stamp()
+            if shard.count > 1:
+                file_name += f"-{shard.index}"
+            unique = DiskLog(
+                os.path.join(storage_constants.LOGS_DIR, config.name, f"{file_name}.log")
+            )
+        if generic is None and unique is None:
+            return None
+        return cls(config.name, output, generic, unique, shard)
+
+    def format(self, timestamp: float, result: "ExecutionResult") -> bytes:
+        record = {
+            "time": timestamp,
+            "config": self.config_name,
+            "index": result.index,
+            "ok": result.ok,
+            "elapsed_ms": round(result.elapsed * 1000, 3),
+            "attempts": result.attempts,
+        }
+        if self.status_code:
+            record["status_code"] = result.status_code
+        if result.error is not None:
+            record["error"] = result.error
+        if self.latency and result.phases is not None:
+            record["phases_ms"] = {
+                phase: round(seconds * 1000, 3)
+                for phase, seconds in result.phases._asdict().items()
+            }
+        if result.corrected is not None:
+            record["corrected_ms"] = round(result.corrected * 1000, 3)
+        if result.body is not None:
+            record["body"] = {
+                "path": result.body.path,
+                "size": result.body.size,
+                "truncated": result.body.truncated,
+            }
+        if result.projection is not None:
+            record["projection"] = result.projection
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+    def format_summary(self, timestamp: float, summary: dict) -> bytes:
+        record = {"time": timestamp, "config": self.config_name, "summary": summary}
+        if self.shard.count > 1:
+            record["shard"] = list(self.shard)
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+    def __call__(self, result: "ExecutionResult") -> None:
+        timestamp = time.time()
+        if self.generic is not None:
+            self.generic.write(self.format, timestamp, result)
+        if self.unique is not None:
+            self.unique.write(self.format, timestamp, result)
+
+    def close(self, summary: Optional["RunSummary"] = None) -> None:
+        """
+        Log the summary of the run and close the unique log. This blocks until it is written.
+        """
+        if summary is not None:
+            for log in (self.generic, self.unique):
+                if log is not None:
+                    log.write(self.format_summary, time.time(), summary.to_dict())
+        if self.unique is not None:
+            self.unique.close()
+
+
+_shared_log: Optional[DiskLog] = None
+_shared_log_path = storage_constants.GENERIC_LOG
+
+
+def shared_log() -> DiskLog:
+    """
+    The generic log, shared by every run of the process and started on first use.
+    """
+    global _shared_log
+    if _shared_log is None:
+        _shared_log = DiskLog(_shared_log_path)
+    return _shared_log
+
+
+def use_worker_log(index: int) -> None:
+    """
+    Write the generic log of a worker process to a file of its own, e.g. `requests-0.log`.
+
+    A log's file is only ever rotated by the process writing it, so worker
+    processes running alongside each other can't share one.
+
+    Args:
+        index (int): The index of the worker.
+    """
+    global _shared_log_path
+    close_shared_log()
+    stem, extension = os.path.splitext(storage_constants.GENERIC_LOG)
+    _shared_log_path = f"{stem}-{index}{extension}"
+
+
+def close_shared_log() -> None:
+    """
+    Write everything buffered for the generic log and stop its writer thread.
+    """
+    global _shared_log
+    if _shared_log is not None:
+        _shared_log.close()
+        _shared_log = None
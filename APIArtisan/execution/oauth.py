@@ -0,0 +1,148 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from ..constants import execution_constants
+from ..models.auth_type import AuthType
+from ..utils.secret_resolver import SecretResolver
+
+if TYPE_CHECKING:
+    import httpx
+
+    from ..models.config import Config
+
+
+class OAuthError(Exception):
+    """
+    Raised when an access token can't be obtained from the token endpoint.
+    """
+
+
+class OAuthCredentials(NamedTuple):
+    token_url: str
+    client_id: str
+    client_secret: str
+    scope: str = ""
+
+    @classmethod
+    def from_config(
+        cls, config: "Config", secrets: Optional[SecretResolver] = None
+    ) -> Optional["OAuthCredentials"]:
+        """
+        Get the client credentials of a config.
+
+        Args:
+            config (Config): The config.
+            secrets (SecretResolver, optional): Resolves the secrets referenced by the config.
+
+        Raises:
+            ValueError: If the auth details reference a secret that does not exist.
+
+        Returns:
+            OAuthCredentials | None: The credentials, or None if the config doesn't use OAuth.
+        """
+        if not config.auth_enabled or config.auth_type != AuthType.OAUTH:
+            return None
+        secrets = secrets if secrets is not None else SecretResolver()
+        details = secrets.resolve_all(config.auth_details)
+        return cls(
+            token_url=details.get("token_url", ""),
+            client_id=details.get("client_id", ""),
+            client_secret=details.get("client_secret", ""),
+            scope=details.get("scope", ""),
+        )
+
+
+class AccessToken(NamedTuple):
+    value: str
+    refresh_at: float
+
+
+class TokenManager:
+    """
+    Obtains access tokens with the client credentials grant and caches them.
+
+    Tokens are shared by every run using the same credentials and are
+    renewed shortly before they expire. Renewals are single-flight: however
+    many requests find the token expired at once, one token call is made and
+    all of them wait for its result.
+    """
+
+    def __init__(self, expiry_margin: float = execution_constants.OAUTH_EXPIRY_MARGIN):
+        """
+        Initializes a TokenManager object.
+
+        Args:
+            expiry_margin (float): How many seconds before its expiry a token is renewed.
+        """
+        self.expiry_margin = expiry_margin
+        self._tokens: dict[OAuthCredentials, AccessToken] = {}
+        self._renewals: dict[OAuthCredentials, asyncio.Future] = {}
+
+    async def token(self, client: "httpx.AsyncClient", credentials: OAuthCredentials) -> str:
+        """
+        Get a valid access token, requesting a new one if needed.
+
+        Args:
+            client (httpx.AsyncClient): The client to call the token endpoint with.
+            credentials (OAuthCredentials): The client credentials.
+
+        Raises:
+            OAuthError: If the token endpoint didn't return a token.
+
+        Returns:
+            str: The access token.
+        """
+        cached = self._tokens.get(credentials)
+        if cached is not None and time.monotonic() < cached.refresh_at:
+            return cached.value
+
+        renewal = self._renewals.get(credentials)
+        if renewal is None:
+            renewal = asyncio.ensure_future(self._request_token(client, credentials))
+            self._renewals[credentials] = renewal
+            renewal.add_done_callback(lambda _: self._renewals.pop(credentials, None))
+        token = await asyncio.shield(renewal)
+        return token.value
+
+    def invalidate(self, credentials: OAuthCredentials, value: str) -> None:
+        """
+        Drop a token the API rejected, unless it was already replaced by a newer one.
+        """
+        cached = self._tokens.get(credentials)
+        if cached is not None and cached.value == value:
+            del self._tokens[credentials]
+
+    async def _request_token(
+        self, client: "httpx.AsyncClient", credentials: OAuthCredentials
+    ) -> AccessToken:
+        import httpx
+
+        data = {"grant_type": "client_credentials"}
+        if credentials.scope:
+            data["scope"] = credentials.scope
+        try:
+            response = await client.post(
+                credentials.token_url,
+                data=data,
+                auth=(credentials.client_id, credentials.client_secret),
+            )
+            response.raise_for_status()
+            payload = response.json()
+            value = payload["access_token"]
+        except (httpx.HTTPError, ValueError, KeyError, TypeError) as e:
+            raise OAuthError(f"Could not get a token from {credentials.token_url}: {e!r}") from e
+
+        try:
+            expires_in = float(payload.get("expires_in", 0)) or None
+        except (TypeError, ValueError):
+            expires_in = None
+        if expires_in is None:
+            expires_in = execution_constants.OAUTH_DEFAULT_EXPIRES_IN
+        margin = min(self.expiry_margin, expires_in / 2)
+        token = AccessToken(value, time.monotonic() + expires_in - margin)
+        self._tokens[credentials] = token
+        return token
+
+
+tokens = TokenManager()
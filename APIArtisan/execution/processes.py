@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from ..constants import execution_constants
+from ..models.config import Config
+from ..models.output_config import OutputOption
+from ..utils import storage
+from .engine import ExecutionResult, Executor, RunSummary
+from .feeds import Shard, open_feed
+from .logs import close_shared_log, run_stamp, use_worker_log
+
+
+def shard_config(config: Config, processes: int) -> dict:
+    """
+    The data of a config as each of `processes` workers runs it.
+
+    The config's rate limit applies to the whole run, so each worker gets
+    its share of it.
+    """
+    data = config.to_dict()
+    if config.rate_limit and config.rate_limit > 0:
+        data["rate_limit"] = config.rate_limit / processes
+        if config.rate_limit_burst > 0:
+            data["rate_limit_burst"] = max(1, config.rate_limit_burst // processes)
+    return data
+
+
+def run_shard(
+    config_data: dict,
+    shard: Shard,
+    repeat: int,
+    concurrency: int,
+    timeout: float,
+    stamp: str,
+    on_result: Optional[Callable[[ExecutionResult], None]] = None,
+) -> RunSummary:
+    """
+    Run one shard of a config in a worker process, with its own event loop and connection pool.
+
+    Raises:
+        ValueError: If the config can't be run, e.g. its feed lacks a variable.
+
+    Returns:
+        RunSummary: The counters and latency histograms of the shard's requests.
+    """
+    storage.use_configured_backend()
+    use_worker_log(shard.index)
+    config = Config.from_dict(config_data)
+    try:
+        return asyncio.run(
+            _run_shard(config, shard, repeat, concurrency, timeout, stamp, on_result)
+        )
+    finally:
+        close_shared_log()
+
+
+async def _run_shard(
+    config: Config,
+    shard: Shard,
+    repeat: int,
+    concurrency: int,
+    timeout: float,
+    stamp: str,
+    on_result: Optional[Callable[[ExecutionResult], None]],
+) -> RunSummary:
+    feed_path = config.variables.feed_path
+    rows = open_feed(feed_path) if feed_path else None
+    async with Executor(concurrency, timeout) as executor:
+        return await executor.run(config, rows, repeat, on_result, shard=shard, stamp=stamp)
+
+
+async def run_in_processes(
+    config: Config,
+    processes: Optional[int] = None,
+    repeat: int = 1,
+    concurrency: int = execution_constants.DEFAULT_CONCURRENCY,
+    timeout: float = execution_constants.DEFAULT_TIMEOUT,
+    on_result: Optional[Callable[[ExecutionResult], None]] = None,
+) -> RunSummary:
+    """
+    Execute a config across several worker processes.
+
+    The rows of the config's variable feed, or its repeats, are dealt out
+    round robin, so each worker reads the feed itself and skips the rows of
+    the others. Every worker runs its shard through its own event loop and
+    connection pool, and their summaries, latency histograms included, are
+    merged into one. Each worker writes the generic log to a file of its own,
+    as rotating a shared one would race. Workers are spawned rather than
+    forked, as the parent usually has threads and a running event loop.
+
+    Args:
+        config (Config): The config to execute.
+        processes (int, optional): The number of workers, one per CPU by default.
+        repeat (int): How many times to send the request when the config has no feed.
+        concurrency (int): The maximum number of requests in flight in each worker.
+        timeout (float): The timeout in seconds for each request.
+        on_result (Callable, optional): Called with each result, in the worker that sent
+            it, so it has to be picklable, e.g. a module level function.
+
+    Raises:
+        ValueError: If the config can't be run, or `processes` is less than 1.
+
+    Returns:
+        RunSummary: The counters for the whole run.
+    """
+    processes = processes if processes is not None else os.cpu_count() or 1
+    if processes < 1:
+        raise ValueError("At least one process is needed")
+    config_data = shard_config(config, processes)
+    stamp = run_stamp()
+    summary = RunSummary(latency=config.output.is_enabled(OutputOption.LATENCY))
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        parts = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    pool,
+                    run_shard,
+                    config_data,
+                    Shard(index, processes),
+                    repeat,
+                    concurrency,
+                    timeout,
+                    stamp,
+                    on_result,
+                )
+                for index in range(processes)
+            )
+        )
+    for part in parts:
+        summary.merge(part)
+    summary.finish()
+    return summary
@@ -0,0 +1,601 @@
+import codecs
+import json
+import re
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+import orjson
+
+if TYPE_CHECKING:
+    from ..models.config import Config
+
+ANY = None
+PATH_STEP = re.compile(
+    r"""\.(?P<name>\*|[^\W\d][\w-]*)"""
+    r"""|\[(?:(?P<index>\d+)|(?P<star>\*)|'(?P<single>[^']*)'|"(?P<double>[^"]*)")\]"""
+)
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+KEY_AND_COLON = re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)"[ \t\n\r]*:', re.S)
+NEXT_KEY_AND_COLON = re.compile(r',[ \t\n\r]*"([^"\\]*(?:\\.[^"\\]*)*)"[ \t\n\r]*:', re.S)
+STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+SCALAR = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null")
+SCALAR_END = re.compile(r"[,\]}\s]")
+DECODER = json.JSONDecoder()
+# orjson decodes integers past 64 bits as floats, so batches stop short of them. With
+# digits mapped to "0" and what can come before a number to "d", they are the runs of
+# 19 or more digits after a "d", a quicker search than a regular expression.
+NUMBER_CHARACTERS = str.maketrans(
+    {
+        character: (
+            "0" if character in "0123456789" else "d" if character in ",:[ \t\n\r-" else "x"
+        )
+        for character in map(chr, range(128))
+    }
+)
+LONG_NUMBER = "d" + "0" * 19
+BATCH_ATTEMPTS = 2
+
+# Skipping the values no path selects: each pattern consumes whole strings and
+# brackets nested up to SKIP_NESTING levels in one match, without backtracking.
+SKIP_NESTING = 8
+PLAIN = r'[^"\[\]{}]++'
+QUOTED = r'"(?:[^"\\]++|\\.)*+"'
+
+
+def _nested(levels: int) -> str:
+    container = rf"[\[{{](?:{PLAIN}|{QUOTED})*+[\]}}]"
+    for _ in range(levels):
+        container = rf"[\[{{](?:{PLAIN}|{QUOTED}|{container})*+[\]}}]"
+    return container
+
+
+SKIPPED_STRING = re.compile(QUOTED, re.S)
+SKIPPED_CONTAINER = re.compile(_nested(SKIP_NESTING), re.S)
+SKIPPED_CONTENT = re.compile(rf"(?:{PLAIN}|{QUOTED}|{_nested(SKIP_NESTING - 1)})*+", re.S)
+
+# The states of a container being parsed
+KEY, FIRST_KEY, COLON, VALUE, FIRST_VALUE, AFTER_VALUE = range(6)
+
+
+def compile_path(expression: str) -> tuple[Union[str, int, None], ...]:
+    """
+    Compile a JSONPath-style expression such as `$.data[*].id` into its steps.
+
+    Supported are `.name`, `['name']`, `[index]`, and `.*` or `[*]` for every
+    member of an object or item of an array.
+
+    Args:
+        expression (str): The expression, starting with `$`.
+
+    Raises:
+        ValueError: If the expression is not supported.
+
+    Returns:
+        tuple: One step per level, a key, an index, or ANY.
+    """
+    expression = expression.strip()
+    if not expression.startswith("$"):
+        raise ValueError(f"{expression} does not start with $")
+    steps: list[Union[str, int, None]] = []
+    position = 1
+    while position < len(expression):
+        match = PATH_STEP.match(expression, position)
+        if match is None:
+            raise ValueError(f"{expression} is not supported after {expression[:position]}")
+        name, index, star, single, double = match.group(
+            "name", "index", "star", "single", "double"
+        )
+        if name == "*" or star:
+            steps.append(ANY)
+        elif index is not None:
+            steps.append(int(index))
+        else:
+            steps.append(next(part for part in (name, single, double) if part is not None))
+        position = match.end()
+    return tuple(steps)
+
+
+def parse_projection(text: str) -> list[str]:
+    """
+    Split and check a projection, one expression per line.
+
+    Raises:
+        ValueError: If an expression is not supported.
+
+    Returns:
+        list[str]: The expressions.
+    """
+    expressions = [line.strip() for line in text.splitlines() if line.strip()]
+    for expression in expressions:
+        compile_path(expression)
+    return expressions
+
+
+def is_valid_projection(text: Optional[str]) -> bool:
+    try:
+        parse_projection(text or "")
+    except ValueError:
+        return False
+    return True
+
+
+def _string_end(buffer: str, position: int) -> int:
+    """
+    Find the end of the string whose content starts at `position`.
+
+    Returns:
+        int: The position after its closing quote, or -1 if it goes on past the buffer.
+    """
+    while True:
+        quote = buffer.find('"', position)
+        if quote < 0:
+            return -1
+        backslash = quote
+        while backslash > 0 and buffer[backslash - 1] == "\\":
+            backslash -= 1
+        if (quote - backslash) % 2 == 0:
+            return quote + 1
+        position = quote + 1
+
+
+def _step_matches(step: Union[str, int, None], element: Union[str, int]) -> bool:
+    return step is ANY or (step == element and type(step) is type(element))
+
+
+def _step_fits(step: Union[str, int, None], is_object: bool) -> bool:
+    return step is ANY or isinstance(step, str) == is_object
+
+
+def _walk(value: Any, steps: tuple, found: list) -> None:
+    if not steps:
+        found.append(value)
+        return
+    step, rest = steps[0], steps[1:]
+    if isinstance(value, dict):
+        if step is ANY:
+            for child in value.values():
+                _walk(child, rest, found)
+        elif isinstance(step, str) and step in value:
+            _walk(value[step], rest, found)
+    elif isinstance(value, list):
+        if step is ANY:
+            for child in value:
+                _walk(child, rest, found)
+        elif isinstance(step, int) and step < len(value):
+            _walk(value[step], rest, found)
+
+
+class _Frame:
+    __slots__ = ("is_object", "alive", "state", "key", "index", "separator")
+
+    def __init__(self, is_object: bool, alive: list[int]):
+        self.is_object = is_object
+        self.alive = alive
+        self.state = FIRST_KEY if is_object else FIRST_VALUE
+        self.key: Union[str, int] = ""
+        self.index = 0
+        # The text between two items of an array every path looks through, from the end
+        # of one to the start of the next, once known. Empty if they can't be batched.
+        self.separator: Optional[str] = None
+
+
+class JsonProjector:
+    """
+    Extracts the values at some paths from a JSON document fed in chunks.
+
+    Only the containers that lead to a requested field are walked token by
+    token. The values the paths select are decoded by the C scanner of the
+    json module, as are the containers a `*` has to look through, and the
+    requested fields are picked out of them; the items of an array a `*`
+    goes through are decoded by orjson, as many as the chunks at hand hold
+    at once. Anything no path selects is
+    skipped by regular expressions that jump over whole strings and nested
+    brackets at once, without turning it into Python objects. Once a key or
+    an index a path names has gone by, the path is done with that container,
+    and once no path is left in a container the rest of it is skipped; when
+    that is the whole document, parsing stops there.
+
+    The document is never held in memory or turned into Python objects as a
+    whole, only about a chunk of it at a time. Object keys are expected to
+    be unique, and what is skipped is only checked for balanced brackets.
+    """
+
+    def __init__(self, expressions: list[str]):
+        """
+        Initializes a JsonProjector object.
+
+        Args:
+            expressions (list[str]): The paths to extract, e.g. `$.data[*].id`.
+
+        Raises:
+            ValueError: If an expression is not supported.
+        """
+        self.expressions = expressions
+        self.paths = [compile_path(expression) for expression in expressions]
+        self.results: dict[str, list] = {expression: [] for expression in expressions}
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer = ""
+        self._position = 0
+        self._stack: list[_Frame] = []
+        self._done = False
+        self._stopped = False
+        self._failure: Optional[ValueError] = None
+        # The value being skipped or captured: its start, the depth reached in it, the
+        # paths captured and deeper, its own depth, whether a string is open, and
+        # whether it is a number or literal.
+        self._scan: Optional[list] = None
+
+    def feed(self, data: bytes) -> None:
+        """
+        Parse the next chunk of the document.
+
+        A document that turns out not to be valid JSON is not parsed any
+        further, the error being raised by `close`.
+        """
+        if self._failure is not None or self._stopped:
+            return
+        try:
+            self._feed(self._decoder.decode(data), final=False)
+        except ValueError as e:
+            self._failure = e
+
+    def _feed(self, text: str, final: bool) -> None:
+        # Drop what was parsed, except for a value being captured or a number.
+        scan = self._scan
+        keep = scan[0] if scan is not None and (scan[2] or scan[6]) else self._position
+        if scan is not None:
+            scan[0] -= keep
+        self._buffer = self._buffer[keep:] + text
+        self._position -= keep
+        self._run(final)
+
+    def close(self) -> dict[str, list]:
+        """
+        Finish parsing the document.
+
+        Raises:
+            ValueError: If the document is not valid JSON or ended early.
+
+        Returns:
+            dict[str, list]: The values found for each expression, in document order.
+        """
+        if self._failure is not None:
+            raise self._failure
+        if not self._stopped:
+            self._feed(self._decoder.decode(b"", final=True), final=True)
+        if not self._done:
+            raise ValueError("The document ended early")
+        return self.results
+
+    def _error(self, position: Optional[int] = None) -> ValueError:
+        position = self._position if position is None else position
+        snippet = self._buffer[position : position + 20]
+        return ValueError(f"Invalid JSON near {snippet!r}")
+
+    def _run(self, final: bool) -> None:
+        buffer = self._buffer
+        while not self._stopped:
+            if self._scan is not None:
+                if not self._scan_value(final):
+                    return
+                continue
+
+            position = WHITESPACE.match(buffer, self._position).end()
+            self._position = position
+            if position >= len(buffer):
+                return
+            if self._done:
+                raise self._error()
+            char = buffer[position]
+
+            if not self._stack:
+                self._start_value(None, None)
+                continue
+
+            frame = self._stack[-1]
+            state = frame.state
+            if state == AFTER_VALUE and not frame.alive:
+                self._skip_rest()
+            elif frame.is_object:
+                if state in (KEY, FIRST_KEY):
+                    match = KEY_AND_COLON.match(buffer, position)
+                    if char == "}" and state == FIRST_KEY:
+                        self._pop()
+                    elif match is not None:
+                        self._key(frame, match)
+                    elif char == '"':
+                        match = STRING_REST.match(buffer, position + 1)
+                        if match is None:
+                            return
+                        key = buffer[position + 1 : match.end() - 1]
+                        if "\\" in key:
+                            key = json.loads(buffer[position : match.end()])
+                        frame.key = key
+                        frame.state = COLON
+                        self._position = match.end()
+                    else:
+                        raise self._error()
+                elif state == COLON:
+                    if char != ":":
+                        raise self._error()
+                    frame.state = VALUE
+                    self._position += 1
+                elif state == VALUE:
+                    frame.state = AFTER_VALUE
+                    self._start_value(frame, frame.key)
+                elif char == ",":
+                    match = NEXT_KEY_AND_COLON.match(buffer, position)
+                    if match is not None:
+                        self._key(frame, match)
+                    else:
+                        frame.state = KEY
+                        self._position += 1
+                elif char == "}":
+                    self._pop()
+                else:
+                    raise self._error()
+            else:
+                if state in (VALUE, FIRST_VALUE):
+                    if char == "]" and state == FIRST_VALUE:
+                        self._pop()
+                    elif not (frame.separator and self._batch(frame)):
+                        frame.state = AFTER_VALUE
+                        self._start_value(frame, frame.index)
+                elif char == ",":
+                    if frame.separator is None:
+                        self._learn_separator(frame)
+                    frame.index += 1
+                    frame.state = VALUE
+                    self._position += 1
+                elif char == "]":
+                    self._pop()
+                else:
+                    raise self._error()
+
+    def _key(self, frame: _Frame, match: re.Match) -> None:
+        key = match.group(1)
+        if "\\" in key:
+            key = json.loads(f'"{key}"')
+        frame.key = key
+        frame.state = VALUE
+        self._position = match.end()
+
+    def _pop(self) -> None:
+        self._stack.pop()
+        self._position += 1
+        if not self._stack:
+            self._done = True
+
+    def _skip_rest(self) -> None:
+        # No path is left in the innermost container, and if none is left in those
+        # around it either, nothing after this in the document can match.
+        self._stack.pop()
+        if not any(frame.alive for frame in self._stack):
+            self._done = self._stopped = True
+        else:
+            self._scan = [self._position, 1, [], [], len(self._stack) + 1, False, False]
+
+    def _learn_separator(self, frame: _Frame) -> None:
+        # Called at the comma after the first item. Only arrays of containers that
+        # every path looks through are batched.
+        buffer = self._buffer
+        depth = len(self._stack)
+        frame.separator = ""
+        if any(self.paths[path][depth - 1] is not ANY for path in frame.alive):
+            return
+        end = self._position - 1
+        while end >= 0 and buffer[end] in " \t\n\r":
+            end -= 1
+        start = WHITESPACE.match(buffer, self._position + 1).end()
+        if end >= 0 and start < len(buffer) and buffer[end] in "}]" and buffer[start] in "{[":
+            frame.separator = buffer[end : start + 1]
+        elif end < 0 or start >= len(buffer):
+            # Cut by the end of the chunk, the next comma will tell.
+            frame.separator = None
+
+    def _batch(self, frame: _Frame) -> bool:
+        """
+        Decode the complete items ahead in one go, up to the last separator in the buffer.
+
+        If the text up to there parses as the items of an array, it can only have
+        been cut between two of them: a cut in a string or a deeper container would
+        leave it unbalanced. Otherwise the separator before is tried, and if the
+        items keep containing it, the array goes on one item at a time.
+
+        Returns:
+            bool: Whether any items were decoded.
+        """
+        buffer = self._buffer
+        position = self._position
+        separator = frame.separator
+        cut = buffer.rfind(separator, position)
+        if cut <= position:
+            return False
+        number = f"d{buffer[position:cut]}".translate(NUMBER_CHARACTERS).find(LONG_NUMBER)
+        end = position + number if number >= 0 else cut + len(separator)
+        for _ in range(BATCH_ATTEMPTS):
+            cut = buffer.rfind(separator, position, end)
+            if cut <= position:
+                return False
+            try:
+                items = orjson.loads(f"[{buffer[position : cut + 1]}]")
+                break
+            except orjson.JSONDecodeError:
+                end = cut
+        else:
+            frame.separator = ""
+            return False
+        depth = len(self._stack)
+        paths = self.paths
+        captured = [path for path in frame.alive if len(paths[path]) == depth]
+        deeper = [path for path in frame.alive if len(paths[path]) > depth]
+        for item in items:
+            self._found(item, captured, deeper, depth)
+        frame.index += len(items) - 1
+        frame.state = AFTER_VALUE
+        self._position = cut + 1
+        return True
+
+    def _start_value(self, frame: Optional[_Frame], element: Union[str, int, None]) -> None:
+        paths = self.paths
+        depth = len(self._stack)
+        if frame is None:
+            alive = list(range(len(paths)))
+        else:
+            alive = [
+                path for path in frame.alive if _step_matches(paths[path][depth - 1], element)
+            ]
+            if alive:
+                # A key or an index only comes once in a container, so the paths naming
+                # this one can't match any element after it.
+                frame.alive = [
+                    path
+                    for path in frame.alive
+                    if paths[path][depth - 1] is ANY or path not in alive
+                ]
+        captured = [path for path in alive if len(paths[path]) == depth]
+        deeper = [path for path in alive if len(paths[path]) > depth]
+        buffer = self._buffer
+        position = self._position
+        char = buffer[position]
+
+        if not captured:
+            if deeper and char in "{[":
+                is_object = char == "{"
+                deeper = [path for path in deeper if _step_fits(paths[path][depth], is_object)]
+            if not deeper or char not in "{[":
+                self._skip_value(char, depth)
+                return
+
+        try:
+            value, end = DECODER.raw_decode(buffer, position)
+        except ValueError:
+            end = None
+        else:
+            # A number cut by the end of the chunk may go on in the next one.
+            if char not in '{["' and not SCALAR_END.match(buffer, end):
+                end = None
+
+        if end is not None:
+            self._position = end
+            self._found(value, captured, deeper, depth)
+            if not self._stack:
+                self._done = True
+        elif not captured:
+            self._stack.append(_Frame(char == "{", deeper))
+            self._position += 1
+        else:
+            # Captured once complete, along with what deeper paths select in it.
+            self._scan = [position, 0, captured, deeper, depth, False, char not in '{["']
+
+    def _skip_value(self, char: str, depth: int) -> None:
+        buffer = self._buffer
+        position = self._position
+        if char in "{[":
+            match = SKIPPED_CONTAINER.match(buffer, position)
+        elif char == '"':
+            match = SKIPPED_STRING.match(buffer, position)
+        else:
+            match = SCALAR.match(buffer, position)
+            if match is not None and not SCALAR_END.match(buffer, match.end()):
+                match = None
+        if match is not None:
+            self._position = match.end()
+            if not self._stack:
+                self._done = True
+        else:
+            # Cut by the end of the chunk, or nested too deep for the patterns.
+            self._scan = [position, 0, [], [], depth, False, char not in '{["']
+
+    def _found(self, value: Any, captured: list[int], deeper: list[int], depth: int) -> None:
+        for path in captured:
+            self.results[self.expressions[path]].append(value)
+        for path in deeper:
+            _walk(value, self.paths[path][depth:], self.results[self.expressions[path]])
+
+    def _scan_value(self, final: bool) -> bool:
+        buffer = self._buffer
+        scan = self._scan
+        start, depth = scan[0], scan[1]
+        position = self._position
+
+        if scan[6]:
+            match = SCALAR_END.search(buffer, position)
+            if match is None and not final:
+                self._position = len(buffer)
+                return False
+            end = match.start() if match is not None else len(buffer)
+            if not SCALAR.fullmatch(buffer, start, end):
+                raise self._error(start)
+        else:
+            end = None
+            while end is None:
+                if scan[5]:
+                    position = _string_end(buffer, position)
+                    if position < 0:
+                        # Resume at the backslashes the buffer ends with, if any,
+                        # so the next chunk can tell whether its quote is escaped.
+                        position = len(buffer)
+                        while position > 0 and buffer[position - 1] == "\\":
+                            position -= 1
+                        self._position = position
+                        scan[1] = depth
+                        return False
+                    scan[5] = False
+                    if depth == 0:
+                        end = position
+                    continue
+                if depth:
+                    position = SKIPPED_CONTENT.match(buffer, position).end()
+                    if position >= len(buffer):
+                        self._position = position
+                        scan[1] = depth
+                        return False
+                char = buffer[position]
+                position += 1
+                if char == '"':
+                    scan[5] = True
+                elif char in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        end = position
+
+        self._scan = None
+        self._position = end
+        captured, deeper = scan[2], scan[3]
+        if captured or deeper:
+            try:
+                value = json.loads(buffer[start:end])
+            except ValueError:
+                raise self._error(start) from None
+            self._found(value, captured, deeper, scan[4])
+        if not self._stack:
+            self._done = True
+        return True
+
+
+class Projection:
+    """
+    The fields a config extracts from its response bodies.
+    """
+
+    def __init__(self, expressions: list[str]):
+        self.expressions = expressions
+        for expression in expressions:
+            compile_path(expression)
+
+    @classmethod
+    def from_config(cls, config: "Config") -> Optional["Projection"]:
+        """
+        Raises:
+            ValueError: If an expression is not supported.
+
+        Returns:
+            Projection | None: The projection, or None if the config doesn't project bodies.
+        """
+        expressions = parse_projection(config.output.body_projection)
+        return cls(expressions) if expressions else None
+
+    def start(self) -> JsonProjector:
+        return JsonProjector(self.expressions)
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from ..models.config import Config
+
+
+def host_of(url: str) -> str:
+    """
+    Get the host (and port) of a URL without fully parsing it.
+
+    Args:
+        url (str): An absolute URL.
+
+    Returns:
+        str: The lowercased network location of the URL.
+    """
+    start = url.find("://")
+    start = 0 if start < 0 else start + 3
+    end = len(url)
+    for separator in "/?#":
+        position = url.find(separator, start)
+        if 0 <= position < end:
+            end = position
+    host = url[start:end]
+    return host.rsplit("@", 1)[-1].lower()
+
+
+class TokenBucket:
+    """
+    A token bucket that hands out reservations instead of queueing waiters.
+
+    Each acquire takes a token straight away and, if that leaves the bucket
+    in debt, sleeps until the debt is repaid. While the bucket has tokens an
+    acquire is a few arithmetic operations with no await, and because debts
+    are handed out in order, waiters are served first come, first served.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initializes a TokenBucket object.
+
+        Args:
+            rate (float): The number of tokens added per second.
+            capacity (float): The most tokens the bucket holds, which is the burst size.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        Take a token.
+
+        Returns:
+            float: How many seconds to wait before the token may be used.
+        """
+        now = time.monotonic()
+        tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate) - 1
+        self.tokens = tokens
+        self.updated = now
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class RateLimiterRegistry:
+    """
+    The token buckets of the process, shared by every run that uses the same key and limit.
+
+    Runs with different limits on the same key get buckets of their own, so
+    neither overwrites the other's limit.
+    """
+
+    def __init__(self):
+        self._buckets: dict[tuple[str, float, float], TokenBucket] = {}
+
+    def get(self, key: str, rate: float, burst: float) -> TokenBucket:
+        """
+        Get the bucket for a key and limit, creating it on first use.
+
+        Args:
+            key (str): A host, or a config scope.
+            rate (float): The requests per second allowed.
+            burst (float): The requests that may be sent at once.
+
+        Returns:
+            TokenBucket: The shared bucket.
+        """
+        bucket = self._buckets.get((key, rate, burst))
+        if bucket is None:
+            bucket = self._buckets[(key, rate, burst)] = TokenBucket(rate, burst)
+        return bucket
+
+
+class RateLimiter:
+    """
+    The rate limit of one run, resolved to the shared bucket of each request.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        per_host: bool,
+        scope: str,
+        registry: Optional[RateLimiterRegistry] = None,
+    ):
+        """
+        Initializes a RateLimiter object.
+
+        Args:
+            rate (float): The requests per second allowed.
+            burst (float): The requests that may be sent at once.
+            per_host (bool): Whether the limit applies per host rather than to the scope.
+            scope (str): The key shared by every request when not limiting per host.
+            registry (RateLimiterRegistry, optional): Where buckets are shared, the
+                process-wide registry by default.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.per_host = per_host
+        self.scope = scope
+        self.registry = registry if registry is not None else limiters
+        self._last_host: Optional[str] = None
+        self._last_bucket: Optional[TokenBucket] = None
+        if not per_host:
+            self._last_bucket = self.registry.get(scope, rate, burst)
+
+    @classmethod
+    def from_config(cls, config: "Config") -> Optional["RateLimiter"]:
+        """
+        Build the limiter set on a config.
+
+        Returns:
+            RateLimiter | None: The limiter, or None if the config is not rate limited.
+        """
+        if not config.rate_limit or config.rate_limit <= 0:
+            return None
+        burst = config.rate_limit_burst if config.rate_limit_burst > 0 else config.rate_limit
+        return cls(
+            rate=float(config.rate_limit),
+            burst=float(max(1, burst)),
+            per_host=config.rate_limit_per_host,
+            scope=f"config:{config.name}",
+        )
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        if not self.per_host:
+            return self._last_bucket
+        host = host_of(url)
+        if host != self._last_host:
+            self._last_bucket = self.registry.get(host, self.rate, self.burst)
+            self._last_host = host
+        return self._last_bucket
+
+    async def wait(self, url: str) -> None:
+        """
+        Wait until a request to the URL may be sent.
+
+        Args:
+            url (str): The URL of the request.
+        """
+        await self.bucket_for(url).acquire()
+
+
+limiters = RateLimiterRegistry()
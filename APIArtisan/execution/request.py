@@ -0,0 +1,77 @@
+import base64
+import json
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from ..models.auth_type import AuthType
+from ..utils.secret_resolver import SecretResolver
+
+if TYPE_CHECKING:
+    from ..models.config import Config
+
+
+class PreparedRequest(NamedTuple):
+    method: str
+    url: str
+    headers: dict
+    content: Optional[bytes]
+
+
+def auth_headers(config: "Config", secrets: Optional[SecretResolver] = None) -> dict:
+    """
+    Build the headers needed to authenticate a config's requests.
+
+    OAuth tokens expire during long runs, so they are not part of these
+    headers; the executor adds them to each request it sends.
+
+    Args:
+        config (Config): The config to build the headers for.
+        secrets (SecretResolver, optional): Resolves the secrets referenced by the auth
+            details, shared by every request of a run.
+
+    Raises:
+        ValueError: If the auth details reference a secret that does not exist.
+
+    Returns:
+        dict: The authentication headers, empty if authentication is disabled.
+    """
+    if not config.auth_enabled:
+        return {}
+
+    secrets = secrets if secrets is not None else SecretResolver()
+    details = secrets.resolve_all(config.auth_details)
+    match config.auth_type:
+        case AuthType.BASIC:
+            credentials = f"{details.get('username', '')}:{details.get('password', '')}"
+            encoded = base64.b64encode(credentials.encode()).decode()
+            return {"Authorization": f"Basic {encoded}"}
+        case AuthType.BEARER:
+            return {"Authorization": f"Bearer {details.get('token', '')}"}
+        case _:
+            return {}
+
+
+def prepare_request(
+    config: "Config", secrets: Optional[SecretResolver] = None
+) -> PreparedRequest:
+    """
+    Turn a config into a request that can be sent as many times as needed.
+
+    The body is encoded once here so that repeated sends don't pay for it.
+
+    Args:
+        config (Config): The config to prepare.
+        secrets (SecretResolver, optional): Resolves the secrets referenced by the config.
+
+    Returns:
+        PreparedRequest: The method, url, headers and encoded body of the request.
+    """
+    http_config = config.http_config
+    headers = dict(http_config.headers)
+    headers.update(auth_headers(config, secrets))
+    content = json.dumps(http_config.body).encode() if http_config.body else None
+    return PreparedRequest(
+        method=str(http_config.method),
+        url=http_config.url,
+        headers=headers,
+        content=content,
+    )
@@ -0,0 +1,128 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Optional
+
+from ..constants import execution_constants
+from .status_codes import MAX_STATUS_CODE, parse_status_codes
+
+if TYPE_CHECKING:
+    from ..models.config import Config
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a `Retry-After` header into a delay in seconds.
+
+    Args:
+        value (str, optional): The header value, either seconds or an HTTP date.
+
+    Returns:
+        float | None: The delay in seconds, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is retried and how long to wait first.
+
+    Only failures that may go away are retried: transport errors, and the
+    status codes configured as retryable, by default 408, 429 and every 5XX.
+    A request rejected with a permanent client error such as 400 or 404 would
+    fail the same way every time, so it is not sent again.
+
+    Delays follow exponential backoff with full jitter, so many requests that
+    fail together spread their retries out instead of arriving in waves. A
+    `Retry-After` from the server takes precedence over the backoff.
+    """
+
+    def __init__(
+        self,
+        retries: int,
+        retry_codes: str = "",
+        base_delay: float = execution_constants.RETRY_BASE_DELAY,
+        max_delay: float = execution_constants.RETRY_MAX_DELAY,
+        retry_after_max_delay: float = execution_constants.RETRY_AFTER_MAX_DELAY,
+    ):
+        """
+        Initializes a RetryPolicy object.
+
+        Args:
+            retries (int): How many times a request is retried after its first attempt.
+            retry_codes (str): The status codes worth retrying, e.g. `429,502-504`,
+                `DEFAULT_RETRY_CODES` if empty.
+            base_delay (float): The backoff ceiling in seconds for the first retry.
+            max_delay (float): The largest backoff ceiling in seconds.
+            retry_after_max_delay (float): The longest `Retry-After` that is honoured.
+
+        Raises:
+            ValueError: If the retryable codes can't be parsed.
+        """
+        table = bytearray(MAX_STATUS_CODE + 1)
+        for codes in parse_status_codes(retry_codes or execution_constants.DEFAULT_RETRY_CODES):
+            table[codes.start : codes.stop] = b"\x01" * len(codes)
+        self.retryable = bytes(table)
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_after_max_delay = retry_after_max_delay
+
+    @classmethod
+    def from_config(cls, config: "Config") -> Optional["RetryPolicy"]:
+        """
+        Build the policy set on a config's Retries controls.
+
+        Raises:
+            ValueError: If the config's retryable codes can't be parsed.
+
+        Returns:
+            RetryPolicy | None: The policy, or None if retrying is switched off.
+        """
+        if not config.retry_enabled or config.retry_count < 1:
+            return None
+        return cls(retries=config.retry_count, retry_codes=config.retry_codes)
+
+    def should_retry(self, ok: bool, status_code: Optional[int], attempt: int) -> bool:
+        """
+        Args:
+            ok (bool): Whether the last attempt succeeded.
+            status_code (int, optional): The status code of the last attempt, None if it
+                got no response.
+            attempt (int): The number of retries already made.
+
+        Returns:
+            bool: Whether another attempt should be made.
+        """
+        if ok or attempt >= self.retries:
+            return False
+        if status_code is None:
+            return True
+        return 0 <= status_code <= MAX_STATUS_CODE and self.retryable[status_code] == 1
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        The time to wait before the next attempt.
+
+        Args:
+            attempt (int): The number of retries already made.
+            retry_after (float, optional): The delay the server asked for.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.retry_after_max_delay)
+        ceiling = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0, ceiling)
@@ -0,0 +1,97 @@
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from ..models.config import Config
+
+MAX_STATUS_CODE = 599
+
+
+def parse_status_codes(text: str) -> list[range]:
+    """
+    Parse a comma separated list of status codes and ranges such as `200-299,304`.
+
+    Args:
+        text (str): The list to parse.
+
+    Raises:
+        ValueError: If an entry is not a status code or a range of status codes.
+
+    Returns:
+        list[range]: The ranges, single codes as ranges of one.
+    """
+    ranges: list[range] = []
+    for entry in text.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        low, separator, high = entry.partition("-")
+        try:
+            start = int(low)
+            end = int(high) if separator else start
+        except ValueError:
+            raise ValueError(f"{entry} is not a status code or a range") from None
+        if not 100 <= start <= end <= MAX_STATUS_CODE:
+            raise ValueError(f"{entry} is not a range of status codes between 100 and 599")
+        ranges.append(range(start, end + 1))
+    return ranges
+
+
+def is_valid_status_codes(text: Optional[str]) -> bool:
+    try:
+        parse_status_codes(text or "")
+    except ValueError:
+        return False
+    return True
+
+
+class StatusCodes:
+    """
+    A lookup table saying whether each status code counts as a success.
+
+    The table is built once per run, so classifying a response is a single
+    index instead of parsing the configured lists again.
+    """
+
+    __slots__ = ("table",)
+
+    def __init__(self, successful: str = "", unsuccessful: str = ""):
+        """
+        Initializes a StatusCodes object.
+
+        When no successful codes are given, every 2XX status is a success.
+        Unsuccessful codes take precedence over successful ones.
+
+        Args:
+            successful (str): The successful codes, e.g. `200-299,304`.
+            unsuccessful (str): The unsuccessful codes.
+
+        Raises:
+            ValueError: If either list can't be parsed.
+        """
+        table = bytearray(MAX_STATUS_CODE + 1)
+        successful_ranges = parse_status_codes(successful) or [range(200, 300)]
+        for codes in successful_ranges:
+            table[codes.start : codes.stop] = b"\x01" * len(codes)
+        for codes in parse_status_codes(unsuccessful):
+            table[codes.start : codes.stop] = bytes(len(codes))
+        self.table = bytes(table)
+
+    @classmethod
+    def from_config(cls, config: "Config") -> "StatusCodes":
+        return cls(config.success_codes, config.failure_codes)
+
+    def is_success(self, status_code: int) -> bool:
+        """
+        Args:
+            status_code (int): The status code of a response.
+
+        Returns:
+            bool: Whether the status code counts as a success.
+        """
+        try:
+            return self.table[status_code] == 1
+        except IndexError:
+            return False
+
+
+DEFAULT_STATUS_CODES = StatusCodes()
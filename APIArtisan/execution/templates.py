@@ -0,0 +1,191 @@
+import json
+import re
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional, Sequence
+
+from ..models.variable_config import VariableSection
+from ..utils.secret_resolver import SecretResolver
+from .request import PreparedRequest, auth_headers
+
+if TYPE_CHECKING:
+    from ..models.config import Config
+
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][\w.-]*)\s*\}\}")
+
+
+class CompiledTemplate:
+    """
+    A template split once into literal segments and the slots between them.
+
+    `parts` always holds one more literal than there are slots, so rendering is
+    a single interleaving join of the literals with the slot values.
+    """
+
+    __slots__ = ("parts", "slots")
+
+    def __init__(self, parts: tuple[str, ...], slots: tuple[int, ...]):
+        self.parts = parts
+        self.slots = slots
+
+    @property
+    def is_static(self) -> bool:
+        return not self.slots
+
+    def render(self, values: Sequence[str]) -> str:
+        """
+        Fill the slots with values.
+
+        Args:
+            values (Sequence[str]): The values of the variables, indexed by slot.
+
+        Returns:
+            str: The rendered template.
+        """
+        parts = self.parts
+        if not self.slots:
+            return parts[0]
+        out = [parts[0]]
+        for slot, literal in zip(self.slots, parts[1:]):
+            out.append(values[slot])
+            out.append(literal)
+        return "".join(out)
+
+
+def compile_template(
+    text: str, variables: dict[str, int], allowed: Optional[Iterable[str]] = None
+) -> CompiledTemplate:
+    """
+    Split a template around its `{{variable}}` placeholders.
+
+    Every variable that is found is given a slot in `variables`, so several
+    templates compiled against the same dict share one table of values.
+
+    Args:
+        text (str): The template text.
+        variables (dict[str, int]): The slot index of every known variable, updated in place.
+        allowed (Iterable[str], optional): If given, only these variables are substituted.
+
+    Returns:
+        CompiledTemplate: The compiled template.
+    """
+    allowed = set(allowed) if allowed else None
+    parts: list[str] = []
+    slots: list[int] = []
+    literal_start = 0
+    for match in PLACEHOLDER.finditer(text):
+        name = match.group(1)
+        if allowed is not None and name not in allowed:
+            continue
+        parts.append(text[literal_start : match.start()])
+        slots.append(variables.setdefault(name, len(variables)))
+        literal_start = match.end()
+    parts.append(text[literal_start:])
+    return CompiledTemplate(tuple(parts), tuple(slots))
+
+
+def escape_json_string(value: str) -> str:
+    """
+    Escape a value so it can be placed inside a JSON string literal.
+    """
+    return json.dumps(value, ensure_ascii=False)[1:-1]
+
+
+class CompiledRequest:
+    """
+    A config's URL, headers and body compiled once for rendering per input row.
+
+    The body is serialized to JSON a single time and split around its
+    placeholders; values rendered into it are escaped as JSON string content.
+    Sections with variable substitution switched off are kept as literals.
+    """
+
+    def __init__(self, config: "Config", secrets: Optional[SecretResolver] = None):
+        http_config = config.http_config
+        variable_config = config.variables
+        variables: dict[str, int] = {}
+
+        self.method = str(http_config.method)
+
+        if variable_config.is_enabled(VariableSection.URL):
+            allowed = variable_config.names(VariableSection.URL)
+            self.url = compile_template(http_config.url, variables, allowed)
+        else:
+            self.url = CompiledTemplate((http_config.url,), ())
+
+        self.static_headers: dict[str, str] = {}
+        self.header_templates: list[tuple[CompiledTemplate, CompiledTemplate]] = []
+        if variable_config.is_enabled(VariableSection.HEADERS):
+            allowed = variable_config.names(VariableSection.HEADERS)
+            for key, value in http_config.headers.items():
+                key_template = compile_template(str(key), variables, allowed)
+                value_template = compile_template(str(value), variables, allowed)
+                if key_template.is_static and value_template.is_static:
+                    self.static_headers[key] = str(value)
+                else:
+                    self.header_templates.append((key_template, value_template))
+        else:
+            self.static_headers.update(http_config.headers)
+        self.static_headers.update(auth_headers(config, secrets))
+
+        self.body_slots: frozenset[int] = frozenset()
+        if not http_config.body:
+            self.body = None
+        else:
+            body = json.dumps(http_config.body, ensure_ascii=False)
+            if variable_config.is_enabled(VariableSection.BODY):
+                allowed = variable_config.names(VariableSection.BODY)
+                self.body = compile_template(body, variables, allowed)
+                self.body_slots = frozenset(self.body.slots)
+            else:
+                self.body = CompiledTemplate((body,), ())
+        self._static_content = (
+            self.body.parts[0].encode() if self.body is not None and self.body.is_static else None
+        )
+
+        self.variables: tuple[str, ...] = tuple(variables)
+
+    def values_from(self, row: Mapping[str, str]) -> list[str]:
+        """
+        Order the values of a row by slot.
+
+        Args:
+            row (Mapping[str, str]): The value of each variable by name.
+
+        Raises:
+            KeyError: If the row is missing a variable used by the templates.
+
+        Returns:
+            list[str]: The values indexed by slot.
+        """
+        return [str(row[name]) for name in self.variables]
+
+    def render(self, values: Sequence[str]) -> PreparedRequest:
+        """
+        Render a request for one row of values.
+
+        Args:
+            values (Sequence[str]): The values indexed by slot, see `variables`.
+
+        Returns:
+            PreparedRequest: The request ready to send.
+        """
+        headers = self.static_headers
+        if self.header_templates:
+            headers = dict(headers)
+            for key_template, value_template in self.header_templates:
+                headers[key_template.render(values)] = value_template.render(values)
+
+        if self._static_content is not None or self.body is None:
+            content = self._static_content
+        else:
+            escaped = [
+                escape_json_string(value) if slot in self.body_slots else value
+                for slot, value in enumerate(values)
+            ]
+            content = self.body.render(escaped).encode()
+
+        return PreparedRequest(
+            method=self.method,
+            url=self.url.render(values),
+            headers=headers,
+            content=content,
+        )
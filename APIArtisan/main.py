@@ -2,17 +2,24 @@ import json
 
 from nicegui import ui, app
 
+from .execution import logs
 from .pages import page_builder
-from .utils import screen_size, storage
+from .utils import autosave, screen_size, storage
+from .utils.secret_resolver import session_secrets
 from .constants import globals, storage_constants
 
 storage.create_if_doesnt_exist()
 settings = storage.Settings()
+storage.use_backend(settings.get_storage_backend())
+storage.secrets.subscribe(session_secrets.apply)
 
 print(f"Initiating {globals.APP_TITLE} with settings:")
 print(json.dumps(settings.get_settings(), indent=storage_constants.INDENTATION))
 
 page_builder.create_pages()
+app.on_startup(storage.watch_all)
+app.on_shutdown(autosave.configs.flush)
+app.on_shutdown(logs.close_shared_log)
 
 screen_size = screen_size.get_screen_size()
 
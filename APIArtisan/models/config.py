@@ -1,76 +1,143 @@
-from enum import Enum
-import json
-from nicegui import ui
+import orjson
 from ..utils import storage
 
 from .auth_type import AuthType
 from .http_config import HTTPConfig
-from ..constants import storage_constants
+from .load_config import LoadConfig
+from .outcome import Outcome
+from .output_config import OutputConfig
+from .variable_config import VariableConfig
 
 
 class Config:
+    __slots__ = (
+        "name",
+        "auth_enabled",
+        "auth_type",
+        "auth_details",
+        "http_config",
+        "variables",
+        "retry_enabled",
+        "retry_count",
+        "retry_codes",
+        "rate_limit",
+        "rate_limit_burst",
+        "rate_limit_per_host",
+        "success_codes",
+        "failure_codes",
+        "output",
+        "load",
+    )
+
     def __init__(
         self,
         name: str,
         auth_enabled: bool = False,
         auth_type: AuthType = AuthType.NONE,
-        auth_details: dict = {},
-        http_config: HTTPConfig = HTTPConfig(),
+        auth_details: dict | None = None,
+        http_config: HTTPConfig | None = None,
+        variables: VariableConfig | None = None,
+        retry_enabled: bool = False,
+        retry_count: int = 1,
+        retry_codes: str = "",
+        rate_limit: float = 0,
+        rate_limit_burst: int = 0,
+        rate_limit_per_host: bool = True,
+        success_codes: str = "",
+        failure_codes: str = "",
+        output: OutputConfig | None = None,
+        load: LoadConfig | None = None,
     ) -> None:
         self.name = name
         self.auth_enabled = auth_enabled
         self.auth_type = auth_type
-        self.auth_details = auth_details
-        self.http_config = http_config
-
-    def to_json(self):
-        return json.dumps(
-            self,
-            indent=storage_constants.INDENTATION,
-            default=lambda o: str(o) if isinstance(o, Enum) else o.__dict__,
-        )
+        self.auth_details = auth_details if auth_details is not None else {}
+        self.http_config = http_config if http_config is not None else HTTPConfig()
+        self.variables = variables if variables is not None else VariableConfig()
+        self.retry_enabled = retry_enabled
+        self.retry_count = retry_count
+        self.retry_codes = retry_codes
+        self.rate_limit = rate_limit
+        self.rate_limit_burst = rate_limit_burst
+        self.rate_limit_per_host = rate_limit_per_host
+        self.success_codes = success_codes
+        self.failure_codes = failure_codes
+        self.output = output if output is not None else OutputConfig()
+        self.load = load if load is not None else LoadConfig()
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "auth_enabled": self.auth_enabled,
+            "auth_type": self.auth_type.value,
+            "auth_details": self.auth_details,
+            "http_config": self.http_config.to_dict(),
+            "variables": self.variables.to_dict(),
+            "retry_enabled": self.retry_enabled,
+            "retry_count": self.retry_count,
+            "retry_codes": self.retry_codes,
+            "rate_limit": self.rate_limit,
+            "rate_limit_burst": self.rate_limit_burst,
+            "rate_limit_per_host": self.rate_limit_per_host,
+            "success_codes": self.success_codes,
+            "failure_codes": self.failure_codes,
+            "output": self.output.to_dict(),
+            "load": self.load.to_dict(),
+        }
 
-    async def save(self):
+    def to_json(self) -> str:
+        return orjson.dumps(
+            self.to_dict(), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+    async def save(self) -> Outcome:
         try:
             json = self.to_json()
             await storage.configs.write_to_file(json, self.name)
         except FileExistsError:
-            ui.notify(f"A config with this name {self.name} already exists!", type="negative")
-            return
-        ui.notify(
-            f"Config {self.name} successfully saved!",
-            type="positive",
-        )
+            return Outcome(False, f"A config with this name {self.name} already exists!")
+        return Outcome(True, f"Config {self.name} successfully saved!")
 
-    async def update(self):
+    async def update(self) -> Outcome:
         try:
             json = self.to_json()
             await storage.configs.update_file(json, self.name)
         except FileNotFoundError:
-            ui.notify(f"Config {self.name} does not exist!", type="negative")
-            return
-        ui.notify(
-            f"Config {self.name} successfully updated!",
-            type="positive",
-        )
+            return Outcome(False, f"Config {self.name} does not exist!")
+        return Outcome(True, f"Config {self.name} successfully updated!")
 
     @classmethod
     def from_dict(cls, data: dict) -> "Config":
-        data = data.copy()
-        data["auth_type"] = AuthType(data.get("auth_type", AuthType.NONE))
-        data["http_config"] = HTTPConfig.from_dict(data.get("http_config", {}))
-        return cls(**data)
+        auth_details = data.get("auth_details")
+        return cls(
+            name=data["name"],
+            auth_enabled=data.get("auth_enabled", False),
+            auth_type=AuthType(data.get("auth_type", AuthType.NONE)),
+            auth_details=dict(auth_details) if auth_details is not None else None,
+            http_config=HTTPConfig.from_dict(data.get("http_config", {})),
+            variables=VariableConfig.from_dict(data.get("variables", {})),
+            retry_enabled=data.get("retry_enabled", False),
+            retry_count=data.get("retry_count", 1),
+            retry_codes=data.get("retry_codes", ""),
+            rate_limit=data.get("rate_limit", 0),
+            rate_limit_burst=data.get("rate_limit_burst", 0),
+            rate_limit_per_host=data.get("rate_limit_per_host", True),
+            success_codes=data.get("success_codes", ""),
+            failure_codes=data.get("failure_codes", ""),
+            output=OutputConfig.from_dict(data.get("output", {})),
+            load=LoadConfig.from_dict(data.get("load", {})),
+        )
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "Config":
+        return cls.from_dict(orjson.loads(data))
 
-    async def delete(self):
+    async def delete(self) -> Outcome:
         try:
             await storage.configs.delete_file(self.name)
         except FileNotFoundError:
-            ui.notify(f"Config {self.name} does not exist!", type="negative")
-            return
-        ui.notify(
-            f"Config {self.name} successfully deleted!",
-            type="positive",
-        )
+            return Outcome(False, f"Config {self.name} does not exist!")
+        return Outcome(True, f"Config {self.name} successfully deleted!")
 
     def toggle_auth(self):
         self.auth_enabled = not self.auth_enabled
@@ -80,3 +147,27 @@ class Config:
 
     def set_auth_details(self, auth_detail: dict):
         self.auth_details.update(auth_detail)
+
+    def set_retry_enabled(self, retry_enabled: bool):
+        self.retry_enabled = retry_enabled
+
+    def set_retry_count(self, retry_count: int):
+        self.retry_count = int(retry_count)
+
+    def set_retry_codes(self, retry_codes: str):
+        self.retry_codes = retry_codes
+
+    def set_rate_limit(self, rate_limit: float):
+        self.rate_limit = rate_limit
+
+    def set_rate_limit_burst(self, rate_limit_burst: int):
+        self.rate_limit_burst = int(rate_limit_burst)
+
+    def set_rate_limit_per_host(self, rate_limit_per_host: bool):
+        self.rate_limit_per_host = rate_limit_per_host
+
+    def set_success_codes(self, success_codes: str):
+        self.success_codes = success_codes
+
+    def set_failure_codes(self, failure_codes: str):
+        self.failure_codes = failure_codes
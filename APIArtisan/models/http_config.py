@@ -21,32 +21,43 @@ DEFAULT_HEADER = {
 
 
 class HTTPConfig:
+    __slots__ = ("url", "method", "headers", "body")
+
     def __init__(
         self,
         url: str = "https://example.com",
         method: HttpMethod = HttpMethod.GET,
-        headers: dict = DEFAULT_HEADER,
-        body: dict = {},
+        headers: dict | None = None,
+        body: dict | None = None,
     ) -> None:
         self.url = url
-        self.method = method
-        self.headers = headers
-        self.body = body
+        self.method = HttpMethod(method)
+        self.headers = headers if headers is not None else dict(DEFAULT_HEADER)
+        self.body = body if body is not None else {}
 
     def to_dict(self) -> dict:
-        return self.__dict__
+        return {
+            "url": self.url,
+            "method": self.method.value,
+            "headers": self.headers,
+            "body": self.body,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> "HTTPConfig":
-        data = data.copy()
-        data["method"] = HttpMethod(data.get("method", HttpMethod.GET))
-        return cls(**data)
+        headers = data.get("headers")
+        return cls(
+            url=data.get("url", "https://example.com"),
+            method=HttpMethod(data.get("method", HttpMethod.GET.value)),
+            headers=dict(headers) if headers is not None else None,
+            body=data.get("body"),
+        )
 
     def set_url(self, url: str) -> None:
         self.url = url
 
     def set_method(self, method: HttpMethod) -> None:
-        self.method = method
+        self.method = HttpMethod(method)
 
     def set_headers(self, headers: dict) -> None:
         self.headers = headers
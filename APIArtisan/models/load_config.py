@@ -0,0 +1,77 @@
+from enum import Enum
+
+from ..constants import execution_constants
+
+
+class LoadProfile(str, Enum):
+    CONSTANT = "constant"
+    RAMP = "ramp"
+    STEP = "step"
+    SPIKE = "spike"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class LoadConfig:
+    __slots__ = (
+        "profile",
+        "rate",
+        "peak_rate",
+        "duration",
+        "steps",
+        "spike_at",
+        "spike_duration",
+        "max_in_flight",
+    )
+
+    def __init__(
+        self,
+        profile: LoadProfile = LoadProfile.CONSTANT,
+        rate: float = 10.0,
+        peak_rate: float = 100.0,
+        duration: float = 60.0,
+        steps: int = 5,
+        spike_at: float = 30.0,
+        spike_duration: float = 5.0,
+        max_in_flight: int = execution_constants.LOAD_MAX_IN_FLIGHT,
+    ) -> None:
+        self.profile = LoadProfile(profile)
+        self.rate = rate
+        self.peak_rate = peak_rate
+        self.duration = duration
+        self.steps = steps
+        self.spike_at = spike_at
+        self.spike_duration = spike_duration
+        self.max_in_flight = max_in_flight
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LoadConfig":
+        return cls(**{field: data[field] for field in cls.__slots__ if field in data})
+
+    def set_profile(self, profile: LoadProfile) -> None:
+        self.profile = LoadProfile(profile)
+
+    def set_rate(self, rate: float) -> None:
+        self.rate = max(0.0, float(rate))
+
+    def set_peak_rate(self, peak_rate: float) -> None:
+        self.peak_rate = max(0.0, float(peak_rate))
+
+    def set_duration(self, duration: float) -> None:
+        self.duration = max(0.0, float(duration))
+
+    def set_steps(self, steps: int) -> None:
+        self.steps = max(1, int(steps))
+
+    def set_spike_at(self, spike_at: float) -> None:
+        self.spike_at = max(0.0, float(spike_at))
+
+    def set_spike_duration(self, spike_duration: float) -> None:
+        self.spike_duration = max(0.0, float(spike_duration))
+
+    def set_max_in_flight(self, max_in_flight: int) -> None:
+        self.max_in_flight = max(1, int(max_in_flight))
@@ -0,0 +1,10 @@
+from typing import NamedTuple
+
+
+class Outcome(NamedTuple):
+    """
+    The result of storing or deleting a model, for the pages to report to the user.
+    """
+
+    ok: bool
+    message: str
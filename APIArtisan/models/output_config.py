@@ -0,0 +1,65 @@
+from enum import Enum
+
+
+class OutputOption(str, Enum):
+    CONSOLE_LOGS = "console_logs"
+    GENERIC_DISK_LOG = "generic_disk_log"
+    UNIQUE_DISK_LOG = "unique_disk_log"
+    STATUS_CODE = "status_code"
+    LATENCY = "latency"
+    RESPONSE_BODY = "response_body"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class OutputConfig:
+    __slots__ = tuple(option.value for option in OutputOption) + (
+        "body_sample_every",
+        "body_max_bytes",
+        "body_projection",
+    )
+
+    def __init__(
+        self,
+        console_logs: bool = True,
+        generic_disk_log: bool = True,
+        unique_disk_log: bool = False,
+        status_code: bool = True,
+        latency: bool = False,
+        response_body: bool = False,
+        body_sample_every: int = 1,
+        body_max_bytes: int = 0,
+        body_projection: str = "",
+    ) -> None:
+        self.console_logs = console_logs
+        self.generic_disk_log = generic_disk_log
+        self.unique_disk_log = unique_disk_log
+        self.status_code = status_code
+        self.latency = latency
+        self.response_body = response_body
+        self.body_sample_every = body_sample_every
+        self.body_max_bytes = body_max_bytes
+        self.body_projection = body_projection
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "OutputConfig":
+        return cls(**{field: data[field] for field in cls.__slots__ if field in data})
+
+    def is_enabled(self, option: OutputOption) -> bool:
+        return getattr(self, str(option))
+
+    def set_enabled(self, option: OutputOption, enabled: bool) -> None:
+        setattr(self, str(option), enabled)
+
+    def set_body_sample_every(self, body_sample_every: int) -> None:
+        self.body_sample_every = max(1, int(body_sample_every))
+
+    def set_body_max_bytes(self, body_max_bytes: int) -> None:
+        self.body_max_bytes = max(0, int(body_max_bytes))
+
+    def set_body_projection(self, body_projection: str) -> None:
+        self.body_projection = body_projection
@@ -1,62 +1,93 @@
-import json
-from enum import Enum
+from typing import Any, Optional
 
-from nicegui import ui
+import orjson
 from ..utils import storage
-from ..constants import storage_constants
+
+from .outcome import Outcome
+
+REFERENCE_KEY = "secret"
+
+
+def secret_reference(name: str) -> dict:
+    """
+    The value stored in place of a secret's plaintext, e.g. in a config's auth details.
+
+    Args:
+        name (str): The name of the secret.
+
+    Returns:
+        dict: A reference to the secret, resolved when the config is executed.
+    """
+    return {REFERENCE_KEY: name}
+
+
+def referenced_secret(value: Any) -> Optional[str]:
+    """
+    Args:
+        value (Any): A stored value, plaintext or a reference.
+
+    Returns:
+        str | None: The name of the referenced secret, or None if the value is plaintext.
+    """
+    if isinstance(value, dict):
+        return value.get(REFERENCE_KEY)
+    return None
 
 
 class Secret:
+    __slots__ = ("name", "description", "value", "available")
+
     def __init__(self, name: str, value: str, description: str, available: bool):
         self.name = name
         self.description = description
         self.value = value
         self.available = available
 
-    def to_json(self):
-        return json.dumps(
-            self,
-            indent=storage_constants.INDENTATION,
-            default=lambda o: str(o) if isinstance(o, Enum) else o.__dict__,
-        )
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "value": self.value,
+            "available": self.available,
+        }
+
+    def to_json(self) -> str:
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2).decode()
 
-    async def set_availability(self, switch: ui.switch):
-        self.available = switch.value
+    async def set_availability(self, available: bool) -> Outcome:
+        self.available = available
 
         json = self.to_json()
         try:
             await storage.secrets.update_file(json, self.name)
         except FileNotFoundError:
-            ui.notify(f"Secret {self.name} does not exist!", type="negative")
-            return
-        ui.notify(
-            f"Secret {self.name} availability set to {self.available}",
-            type="info",
-        )
+            return Outcome(False, f"Secret {self.name} does not exist!")
+        return Outcome(True, f"Secret {self.name} availability set to {self.available}")
 
     @classmethod
     def from_dict(cls, data: dict) -> "Secret":
-        return cls(**data)
+        return cls(
+            name=data["name"],
+            value=data.get("value", ""),
+            description=data.get("description", ""),
+            available=data.get("available", True),
+        )
 
-    async def save(self):
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "Secret":
+        return cls.from_dict(orjson.loads(data))
+
+    async def save(self) -> Outcome:
         json = self.to_json()
         try:
             await storage.secrets.write_to_file(json, self.name)
         except FileExistsError:
-            ui.notify(f"A secret with this name {self.name} already exists!", type="negative")
-            return
-        ui.notify(
-            f"Secret {self.name} successfully saved!",
-            type="positive",
-        )
+            return Outcome(False, f"A secret with this name {self.name} already exists!")
+        return Outcome(True, f"Secret {self.name} successfully saved!")
 
-    async def delete(self):
+    async def delete(self) -> Outcome:
         try:
             await storage.secrets.delete_file(self.name)
         except FileNotFoundError:
-            ui.notify(f"Secret {self.name} does not exist!", type="negative")
-            return
-        ui.notify(
-            f"Secret {self.name} successfully deleted!",
-            type="positive",
-        )
+            return Outcome(False, f"Secret {self.name} does not exist!")
+        return Outcome(True, f"Secret {self.name} successfully deleted!")
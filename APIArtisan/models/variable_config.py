@@ -0,0 +1,63 @@
+from enum import Enum
+
+
+class VariableSection(str, Enum):
+    URL = "url"
+    BODY = "body"
+    HEADERS = "headers"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class VariableConfig:
+    __slots__ = (
+        "url_enabled",
+        "url_names",
+        "body_enabled",
+        "body_names",
+        "headers_enabled",
+        "headers_names",
+        "feed_path",
+    )
+
+    def __init__(
+        self,
+        url_enabled: bool = False,
+        url_names: str = "",
+        body_enabled: bool = False,
+        body_names: str = "",
+        headers_enabled: bool = False,
+        headers_names: str = "",
+        feed_path: str = "",
+    ) -> None:
+        self.url_enabled = url_enabled
+        self.url_names = url_names
+        self.body_enabled = body_enabled
+        self.body_names = body_names
+        self.headers_enabled = headers_enabled
+        self.headers_names = headers_names
+        self.feed_path = feed_path
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "VariableConfig":
+        return cls(**{field: data[field] for field in cls.__slots__ if field in data})
+
+    def is_enabled(self, section: VariableSection) -> bool:
+        return getattr(self, f"{section}_enabled")
+
+    def names(self, section: VariableSection) -> list[str]:
+        names = getattr(self, f"{section}_names")
+        return [name.strip() for name in names.split(",") if name.strip()]
+
+    def set_enabled(self, section: VariableSection, enabled: bool) -> None:
+        setattr(self, f"{section}_enabled", enabled)
+
+    def set_names(self, section: VariableSection, names: str) -> None:
+        setattr(self, f"{section}_names", names)
+
+    def set_feed_path(self, feed_path: str) -> None:
+        self.feed_path = feed_path
@@ -0,0 +1,196 @@
+from typing import NamedTuple, Optional
+
+from nicegui import ui
+
+from ..constants import execution_constants
+from ..execution.live import LiveStats, SecondStats
+from ..models.config import Config
+from ..models.outcome import Outcome
+from ..utils.secret_resolver import session_secrets
+from .notifications import notify_outcome
+
+# Added to the page head once. The charts keep their own copy of the series,
+# so each tick only sends the seconds that closed since the previous one.
+CHART_SCRIPT = """
+<script>
+function appendLiveSeconds(chart, points, capacity) {
+  // Each point is [second, value of the first series, value of the second, ...].
+  chart.liveSeries ??= chart.getOption().series.map(() => []);
+  for (const point of points) {
+    chart.liveSeries.forEach((data, i) => data.push([point[0], point[i + 1]]));
+  }
+  for (const data of chart.liveSeries) {
+    if (data.length > capacity) data.splice(0, data.length - capacity);
+  }
+  chart.setOption({ series: chart.liveSeries.map((data) => ({ data })) });
+}
+function clearLiveSeconds(chart) {
+  chart.liveSeries = chart.getOption().series.map(() => []);
+  chart.setOption({ series: chart.liveSeries.map((data) => ({ data })) });
+}
+</script>
+"""
+
+
+class LiveRun(NamedTuple):
+    name: str
+    stats: LiveStats
+
+
+def line_chart(y_axes: list[dict], series: list[dict]) -> ui.echart:
+    return ui.echart(
+        {
+            "animation": False,
+            "tooltip": {"trigger": "axis"},
+            "legend": {},
+            "xAxis": {"type": "value", "name": "s", "minInterval": 1},
+            "yAxis": y_axes,
+            "series": [
+                {"type": "line", "showSymbol": False, "data": [], **options} for options in series
+            ],
+        }
+    ).classes("w-full h-64")
+
+
+class LivePanel:
+    """
+    Charts the throughput, error rate and latency percentiles of the active run, per second.
+
+    The seconds come from the run's ring buffer of aggregates, and every
+    tick of the page's timer sends only those that closed since the last
+    one. A panel built while a run is in progress catches up on the
+    buffered seconds on its first tick.
+    """
+
+    def __init__(self):
+        self.run: Optional[LiveRun] = None
+        self.sent = -1
+        with ui.card().classes("w-full") as self.card:
+            ui.markdown("##### Live Run")
+            self.status = ui.label()
+            self.throughput = line_chart(
+                [
+                    {"type": "value", "name": "req/s"},
+                    {"type": "value", "name": "errors %", "min": 0, "max": 100},
+                ],
+                [{"name": "Throughput"}, {"name": "Error rate", "yAxisIndex": 1}],
+            )
+            self.latency = line_chart(
+                [{"type": "value", "name": "ms"}],
+                [{"name": "p50"}, {"name": "p90"}, {"name": "p99"}],
+            )
+        self.card.set_visibility(False)
+
+    @property
+    def is_deleted(self) -> bool:
+        return self.card.is_deleted
+
+    def watch(self, run: LiveRun) -> None:
+        if self.run is not None:
+            self.throughput.run_chart_method("clearLiveSeconds")
+            self.latency.run_chart_method("clearLiveSeconds")
+        self.run = run
+        self.sent = -1
+        self.status.set_text(f"{run.name}: starting")
+        self.card.set_visibility(True)
+
+    def tick(self) -> None:
+        if self.run is None:
+            return
+        stats = self.run.stats
+        stats.roll()
+        seconds = stats.since(self.sent)
+        if not seconds:
+            return
+        self.sent = seconds[-1].second
+        capacity = execution_constants.LIVE_HISTORY_SECONDS
+        self.throughput.run_chart_method(
+            "appendLiveSeconds",
+            [[second.second, second.requests, round(second.error_rate, 2)] for second in seconds],
+            capacity,
+        )
+        self.latency.run_chart_method(
+            "appendLiveSeconds",
+            [[second.second, second.p50, second.p90, second.p99] for second in seconds],
+            capacity,
+        )
+        self.status.set_text(describe(self.run, seconds[-1]))
+
+
+def describe(run: LiveRun, last: SecondStats) -> str:
+    stats = run.stats
+    state = "finished" if stats.finished else "running"
+    return (
+        f"{run.name} {state}: {stats.total} requests, {stats.errors} errors. "
+        f"Last second {last.requests} req/s, {last.error_rate:.1f}% errors, "
+        f"p50 {last.p50:g} ms, p90 {last.p90:g} ms, p99 {last.p99:g} ms"
+    )
+
+
+active_run: Optional[LiveRun] = None
+live_panel: Optional[LivePanel] = None
+
+
+def build_live_panel() -> None:
+    """
+    Build the live panel of a config page, showing the active run if there is one.
+    """
+    global live_panel
+    live_panel = LivePanel()
+    if active_run is not None:
+        live_panel.watch(active_run)
+
+
+def tick() -> None:
+    """
+    Send the seconds the active run closed since the last tick to the live panel.
+    """
+    if live_panel is not None and not live_panel.is_deleted:
+        live_panel.tick()
+
+
+async def run_config(config: Config, load: bool = False) -> None:
+    """
+    Execute a config from the UI, charting it on the live panel as it runs.
+
+    Only one config runs at a time, in the event loop of the UI.
+
+    Args:
+        config (Config): The config to execute, as currently edited.
+        load (bool): Whether to run it as a load test following its load profile.
+    """
+    # The execution engine isn't needed by the rest of the UI, so it is imported on first run.
+    from ..execution.engine import Executor
+    from ..execution.feeds import open_feed
+    from ..execution.load import run_load
+
+    global active_run
+    if active_run is not None and not active_run.stats.finished:
+        ui.notify(f"{active_run.name} is still running", type="warning")
+        return
+    stats = LiveStats()
+    active_run = LiveRun(config.name, stats)
+    if live_panel is not None and not live_panel.is_deleted:
+        live_panel.watch(active_run)
+
+    try:
+        feed_path = config.variables.feed_path
+        rows = open_feed(feed_path) if feed_path else None
+        async with Executor() as executor:
+            if load:
+                summary = await run_load(executor, config, rows, stats.record, session_secrets)
+            else:
+                summary = await executor.run(
+                    config, rows, on_result=stats.record, secrets=session_secrets
+                )
+    except (ValueError, OSError) as e:
+        notify_outcome(Outcome(False, f"{config.name} could not run: {e}"))
+        return
+    finally:
+        stats.finish()
+    notify_outcome(
+        Outcome(
+            summary.succeeded == summary.total,
+            f"{config.name}: {summary.succeeded} of {summary.total} requests succeeded",
+        )
+    )
@@ -1,92 +1,107 @@
 import json
 
 from functools import partial
+from typing import Callable
+
 from nicegui import ui
+from nicegui.events import EventArguments
 
-from APIArtisan.models.secret import Secret
-from APIArtisan.utils import storage
+from APIArtisan.models.secret import referenced_secret, secret_reference
+from APIArtisan.utils import autosave, storage
 
+from ..execution.projection import is_valid_projection
+from ..execution.status_codes import is_valid_status_codes
 from ..models.config import Config
 from ..models.auth_type import AuthType
+from ..models.load_config import LoadProfile
+from ..models.output_config import OutputOption
+from ..models.variable_config import VariableSection
+from . import live_run
+from .notifications import notify_outcome
 
 
-def update_auth_from_secret_func(
-    secret: Secret, config: Config, value_to_update: str, input_to_update: ui.input
-):
-    config.set_auth_details({value_to_update: secret.value})
-    input_to_update.set_value(secret.value)
-    ui.notify(f"Updated {value_to_update} with {secret.name}")
+def autosaved(config: Config, handler: Callable[[EventArguments], None]) -> Callable:
+    """
+    Wrap a change handler so the edited config is saved in the background afterwards.
 
+    Args:
+        config (Config): The config the handler edits.
+        handler (Callable): The change handler.
 
-def build_secret_dropdown(
-    secrets: list[Secret], config: Config, value_to_update: str, input_to_update: ui.input
-):
+    Returns:
+        Callable: The wrapped handler.
+    """
+
+    def on_change(event: EventArguments) -> None:
+        handler(event)
+        autosave.configs.schedule(config)
+
+    return on_change
+
+
+def update_auth_from_secret_func(secret_name: str, config: Config, value_to_update: str):
+    config.set_auth_details({value_to_update: secret_reference(secret_name)})
+    autosave.configs.schedule(config)
+    build_auth_details.refresh(config)
+    ui.notify(f"Updated {value_to_update} with {secret_name}")
+
+
+def build_secret_dropdown(secrets: list[dict], config: Config, value_to_update: str):
     with ui.dropdown_button("Choose secret", auto_close=True):
         with ui.list():
             for secret in secrets:
                 update_auth_from_secret = partial(
-                    update_auth_from_secret_func, secret, config, value_to_update, input_to_update
+                    update_auth_from_secret_func, secret["name"], config, value_to_update
                 )
-                with ui.item(on_click=partial(update_auth_from_secret)):
+                with ui.item(on_click=update_auth_from_secret):
                     with ui.item_section():
-                        ui.item_label(f"{secret.name} - {secret.description}")
+                        ui.item_label(f"{secret['name']} - {secret.get('description', '')}")
+
+
+def build_auth_input(
+    config: Config, label: str, value_to_update: str, secrets: list[dict], password: bool = True
+):
+    """
+    An auth detail typed in as plaintext, or a reference to one of the secrets.
+
+    Only the name of a chosen secret is stored in the config, its value is
+    read when the config is executed.
+    """
+    value = config.auth_details.get(value_to_update, "")
+    secret_name = referenced_secret(value)
+    with ui.row():
+        auth_input = ui.input(
+            label,
+            value="" if secret_name is not None else value,
+            on_change=autosaved(
+                config, lambda value: config.set_auth_details({value_to_update: value.value})
+            ),
+            password=password,
+        )
+        if secret_name is not None:
+            auth_input.props(f'placeholder="Using secret {secret_name}"')
+        build_secret_dropdown(secrets, config, value_to_update)
 
 
 @ui.refreshable
-def build_auth_details(config: Config):
-    secrets_dicts = storage.secrets.read_all_from_file()
-    secrets = [Secret.from_dict(secret_dict) for secret_dict in secrets_dicts]
-    enabled_secrets = [secret for secret in secrets if secret.available]
+async def build_auth_details(config: Config):
+    secrets_dicts = await storage.secrets.read_all_from_file_async()
+    enabled_secrets = sorted(
+        (secret for secret in secrets_dicts if secret.get("available", True)),
+        key=lambda secret: secret["name"],
+    )
 
     match config.auth_type:
         case AuthType.BASIC:
-            with ui.row():
-                username_input = ui.input(
-                    "Username",
-                    value=config.auth_details.get("username", ""),
-                    on_change=lambda value: config.set_auth_details({"username": value.value}),
-                    password=True,
-                )
-                build_secret_dropdown(enabled_secrets, config, "username", username_input)
-
-            with ui.row():
-                password_input = ui.input(
-                    "Password",
-                    value=config.auth_details.get("password", ""),
-                    on_change=lambda value: config.set_auth_details({"password": value.value}),
-                    password=True,
-                )
-                build_secret_dropdown(enabled_secrets, config, "password", password_input)
+            build_auth_input(config, "Username", "username", enabled_secrets)
+            build_auth_input(config, "Password", "password", enabled_secrets)
         case AuthType.BEARER:
-            with ui.row():
-                token_input = ui.input(
-                    "Token",
-                    value=config.auth_details.get("token", ""),
-                    on_change=lambda value: config.set_auth_details({"token": value.value}),
-                    password=True,
-                )
-                build_secret_dropdown(enabled_secrets, config, "token", token_input)
+            build_auth_input(config, "Token", "token", enabled_secrets)
         case AuthType.OAUTH:
-            with ui.row():
-                client_id_input = ui.input(
-                    "Client ID",
-                    value=config.auth_details.get("client_id", ""),
-                    on_change=lambda value: config.set_auth_details({"client_id": value.value}),
-                    password=True,
-                )
-                build_secret_dropdown(enabled_secrets, config, "client_id", client_id_input)
-            with ui.row():
-                client_secret_input = ui.input(
-                    "Client Secret",
-                    value=config.auth_details.get("client_secret", ""),
-                    on_change=lambda value: config.set_auth_details(
-                        {"client_secret": value.value}
-                    ),
-                    password=True,
-                )
-                build_secret_dropdown(
-                    enabled_secrets, config, "client_secret", client_secret_input
-                )
+            build_auth_input(config, "Token URL", "token_url", enabled_secrets, password=False)
+            build_auth_input(config, "Client ID", "client_id", enabled_secrets)
+            build_auth_input(config, "Client Secret", "client_secret", enabled_secrets)
+            build_auth_input(config, "Scope", "scope", enabled_secrets, password=False)
         case AuthType.NONE:
             pass
 
@@ -98,22 +113,23 @@ def set_and_refresh_auth(config: Config, auth_type: AuthType):
 
 
 async def update_config_and_refresh_list(config: Config):
-    await config.update()
+    autosave.configs.discard(config)
+    notify_outcome(await config.update())
     build_auth_list.refresh(config)
 
 
 @ui.refreshable
-def build_auth_list(config: Config):
+async def build_auth_list(config: Config):
     if config.auth_enabled:
         ui.toggle(
             [auth.value for auth in AuthType],
             value=config.auth_type.value,
-            on_change=lambda value: set_and_refresh_auth(config, value.value),
+            on_change=autosaved(config, lambda value: set_and_refresh_auth(config, value.value)),
         )
-        build_auth_details(config)
+        await build_auth_details(config)
 
 
-def generate_main_config_page(config: Config, main_body: ui.card):
+async def generate_main_config_page(config: Config, main_body: ui.card):
     main_body.clear()
     with main_body:
         ui.markdown(f"### {config.name}")
@@ -123,10 +139,12 @@ def generate_main_config_page(config: Config, main_body: ui.card):
             ui.markdown("##### Authentication")
             ui.switch(
                 "Use authentication",
-                on_change=lambda: (config.toggle_auth(), build_auth_list.refresh(config)),
+                on_change=autosaved(
+                    config, lambda _: (config.toggle_auth(), build_auth_list.refresh(config))
+                ),
                 value=config.auth_enabled,
             )
-            build_auth_list(config)
+            await build_auth_list(config)
 
         ui.separator()
         with ui.card():
@@ -137,13 +155,17 @@ def generate_main_config_page(config: Config, main_body: ui.card):
                     ui.select(
                         ["GET", "POST", "PUT", "DELETE", "PATCH"],
                         value=config.http_config.method.value,
-                        on_change=lambda value: config.http_config.set_method(value.value),
+                        on_change=autosaved(
+                            config, lambda value: config.http_config.set_method(value.value)
+                        ),
                     )
                 with ui.card_section():
                     ui.label("Endpoint URL")
                     ui.input(
                         value=config.http_config.url,
-                        on_change=lambda value: config.http_config.set_url(value.value),
+                        on_change=autosaved(
+                            config, lambda value: config.http_config.set_url(value.value)
+                        ),
                     )
 
             with ui.card_section():
@@ -154,8 +176,11 @@ def generate_main_config_page(config: Config, main_body: ui.card):
                         "mode": "text",
                         "mainMenuBar": False,
                     },
-                    on_change=lambda value: config.http_config.set_headers(
-                        json.loads(value.content["text"])
+                    on_change=autosaved(
+                        config,
+                        lambda value: config.http_config.set_headers(
+                            json.loads(value.content["text"])
+                        ),
                     ),
                 )
 
@@ -167,8 +192,11 @@ def generate_main_config_page(config: Config, main_body: ui.card):
                         "mode": "text",
                         "mainMenuBar": False,
                     },
-                    on_change=lambda value: config.http_config.set_body(
-                        json.loads(value.content["text"])
+                    on_change=autosaved(
+                        config,
+                        lambda value: config.http_config.set_body(
+                            json.loads(value.content["text"])
+                        ),
                     ),
                 )
 
@@ -179,9 +207,64 @@ def generate_main_config_page(config: Config, main_body: ui.card):
             with ui.row():
                 with ui.card_section():
                     ui.markdown("###### Retries")
-                    ui.switch("Retry on failure")
+                    ui.switch(
+                        "Retry on failure",
+                        value=config.retry_enabled,
+                        on_change=autosaved(
+                            config, lambda value: config.set_retry_enabled(value.value)
+                        ),
+                    )
+                    ui.number(
+                        "Retry count",
+                        value=config.retry_count,
+                        min=1,
+                        max=10,
+                        step=1,
+                        precision=0,
+                        format="%.0f",
+                        on_change=autosaved(
+                            config, lambda value: config.set_retry_count(value.value or 1)
+                        ),
+                    )
+                    ui.input(
+                        "Retry on status codes (csv)",
+                        placeholder="408,429,500-599",
+                        value=config.retry_codes,
+                        on_change=autosaved(
+                            config, lambda value: config.set_retry_codes(value.value)
+                        ),
+                        validation={"Invalid status codes": is_valid_status_codes},
+                    )
+                    ui.label("Transport errors are always retried")
+
+                with ui.card_section():
+                    ui.markdown("###### Rate limit")
+                    ui.number(
+                        "Requests per second (0 for no limit)",
+                        value=config.rate_limit,
+                        min=0,
+                        step=1,
+                        on_change=autosaved(
+                            config, lambda value: config.set_rate_limit(value.value or 0)
+                        ),
+                    )
                     ui.number(
-                        "Retry count", value=1, min=1, max=10, step=1, precision=0, format="%.0f"
+                        "Burst",
+                        value=config.rate_limit_burst,
+                        min=0,
+                        step=1,
+                        precision=0,
+                        format="%.0f",
+                        on_change=autosaved(
+                            config, lambda value: config.set_rate_limit_burst(value.value or 0)
+                        ),
+                    )
+                    ui.switch(
+                        "Limit per host",
+                        value=config.rate_limit_per_host,
+                        on_change=autosaved(
+                            config, lambda value: config.set_rate_limit_per_host(value.value)
+                        ),
                     )
 
                 with ui.card_section():
@@ -189,31 +272,216 @@ def generate_main_config_page(config: Config, main_body: ui.card):
                     ui.label(
                         "If undefined, all status codes that are not 2XX are considered errors"
                     )
-                    ui.input("Successful (csv)")
-                    ui.input("Unsuccessful (csv)")
+                    ui.label("Codes and ranges are accepted, e.g. 200-299,304")
+                    ui.input(
+                        "Successful (csv)",
+                        value=config.success_codes,
+                        on_change=autosaved(
+                            config, lambda value: config.set_success_codes(value.value)
+                        ),
+                        validation={"Invalid status codes": is_valid_status_codes},
+                    )
+                    ui.input(
+                        "Unsuccessful (csv)",
+                        value=config.failure_codes,
+                        on_change=autosaved(
+                            config, lambda value: config.set_failure_codes(value.value)
+                        ),
+                        validation={"Invalid status codes": is_valid_status_codes},
+                    )
+
+        ui.separator()
+        with ui.card():
+            ui.markdown("##### Load Test")
+            ui.label(
+                "Run load test sends requests on this schedule whether or not earlier ones have "
+                "completed, as does a headless run with --load. Retries and status codes apply, "
+                "the rate limit does not, and latency is measured from when each request was due"
+            )
+
+            with ui.row():
+                with ui.card_section():
+                    ui.markdown("###### Profile")
+                    profile = ui.select(
+                        {
+                            LoadProfile.CONSTANT.value: "Constant rate",
+                            LoadProfile.RAMP.value: "Linear ramp",
+                            LoadProfile.STEP.value: "Steps",
+                            LoadProfile.SPIKE.value: "Spike",
+                        },
+                        value=config.load.profile.value,
+                        on_change=autosaved(
+                            config, lambda value: config.load.set_profile(value.value)
+                        ),
+                    )
+                    ui.number(
+                        "Duration (seconds)",
+                        value=config.load.duration,
+                        min=0,
+                        step=1,
+                        on_change=autosaved(
+                            config, lambda value: config.load.set_duration(value.value or 0)
+                        ),
+                    )
+                    ui.number(
+                        "Max requests in flight",
+                        value=config.load.max_in_flight,
+                        min=1,
+                        step=1,
+                        precision=0,
+                        format="%.0f",
+                        on_change=autosaved(
+                            config, lambda value: config.load.set_max_in_flight(value.value or 1)
+                        ),
+                    )
+
+                with ui.card_section():
+                    ui.markdown("###### Arrival rate")
+                    ui.number(
+                        "Requests per second",
+                        value=config.load.rate,
+                        min=0,
+                        step=1,
+                        on_change=autosaved(
+                            config, lambda value: config.load.set_rate(value.value or 0)
+                        ),
+                    )
+                    ui.number(
+                        "Peak requests per second",
+                        value=config.load.peak_rate,
+                        min=0,
+                        step=1,
+                        on_change=autosaved(
+                            config, lambda value: config.load.set_peak_rate(value.value or 0)
+                        ),
+                    ).bind_visibility_from(
+                        profile, "value", backward=lambda value: value != LoadProfile.CONSTANT
+                    )
+                    ui.number(
+                        "Steps",
+                        value=config.load.steps,
+                        min=1,
+                        step=1,
+                        precision=0,
+                        format="%.0f",
+                        on_change=autosaved(
+                            config, lambda value: config.load.set_steps(value.value or 1)
+                        ),
+                    ).bind_visibility_from(
+                        profile, "value", backward=lambda value: value == LoadProfile.STEP
+                    )
+                    ui.number(
+                        "Spike starts after (seconds)",
+                        value=config.load.spike_at,
+                        min=0,
+                        step=1,
+                        on_change=autosaved(
+                            config, lambda value: config.load.set_spike_at(value.value or 0)
+                        ),
+                    ).bind_visibility_from(
+                        profile, "value", backward=lambda value: value == LoadProfile.SPIKE
+                    )
+                    ui.number(
+                        "Spike duration (seconds)",
+                        value=config.load.spike_duration,
+                        min=0,
+                        step=1,
+                        on_change=autosaved(
+                            config, lambda value: config.load.set_spike_duration(value.value or 0)
+                        ),
+                    ).bind_visibility_from(
+                        profile, "value", backward=lambda value: value == LoadProfile.SPIKE
+                    )
 
         ui.separator()
         with ui.card():
             ui.markdown("##### Variable Substitution")
             ui.markdown(
-                "Variables will be searched for in the body, headers, and URL in the format: `{{variable_name}}`\n\nExample URL with a variable  `https://api.example.com/users/{{user_id}}`"
+                "Variables will be searched for in the body, headers, and URL in the format: `{{variable_name}}`\n\nExample URL with a variable  `https://api.example.com/users/{{user_id}}`\n\nLeave the variable name empty to substitute every variable found, or list the names to substitute separated by commas"
             )
 
             with ui.row():
                 with ui.card_section():
                     ui.markdown("###### Endpoint URL")
-                    ui.switch("Variable substitution")
-                    ui.input("Variable name")
+                    ui.switch(
+                        "Variable substitution",
+                        value=config.variables.is_enabled(VariableSection.URL),
+                        on_change=autosaved(
+                            config,
+                            lambda value: config.variables.set_enabled(
+                                VariableSection.URL, value.value
+                            ),
+                        ),
+                    )
+                    ui.input(
+                        "Variable name",
+                        value=config.variables.url_names,
+                        on_change=autosaved(
+                            config,
+                            lambda value: config.variables.set_names(
+                                VariableSection.URL, value.value
+                            ),
+                        ),
+                    )
 
                 with ui.card_section():
                     ui.markdown("###### Body Payload")
-                    ui.switch("Variable substitution")
-                    ui.input("Variable name")
+                    ui.switch(
+                        "Variable substitution",
+                        value=config.variables.is_enabled(VariableSection.BODY),
+                        on_change=autosaved(
+                            config,
+                            lambda value: config.variables.set_enabled(
+                                VariableSection.BODY, value.value
+                            ),
+                        ),
+                    )
+                    ui.input(
+                        "Variable name",
+                        value=config.variables.body_names,
+                        on_change=autosaved(
+                            config,
+                            lambda value: config.variables.set_names(
+                                VariableSection.BODY, value.value
+                            ),
+                        ),
+                    )
 
                 with ui.card_section():
                     ui.markdown("###### Headers")
-                    ui.switch("Variable substitution")
-                    ui.input("Variable name")
+                    ui.switch(
+                        "Variable substitution",
+                        value=config.variables.is_enabled(VariableSection.HEADERS),
+                        on_change=autosaved(
+                            config,
+                            lambda value: config.variables.set_enabled(
+                                VariableSection.HEADERS, value.value
+                            ),
+                        ),
+                    )
+                    ui.input(
+                        "Variable name",
+                        value=config.variables.headers_names,
+                        on_change=autosaved(
+                            config,
+                            lambda value: config.variables.set_names(
+                                VariableSection.HEADERS, value.value
+                            ),
+                        ),
+                    )
+
+            with ui.card_section():
+                ui.markdown("###### Variable Feed")
+                ui.label(
+                    "A .csv or .jsonl file with a column for each variable, one request is sent per row"
+                )
+                ui.input(
+                    "Feed file path",
+                    value=config.variables.feed_path,
+                    on_change=autosaved(
+                        config, lambda value: config.variables.set_feed_path(value.value)
+                    ),
+                ).classes("w-full")
 
         ui.separator()
         with ui.card():
@@ -223,16 +491,78 @@ def generate_main_config_page(config: Config, main_body: ui.card):
                 with ui.card_section():
                     with ui.column():
                         ui.markdown("###### Logs")
-                        ui.switch("Console Logs", value=True)
-                        ui.switch("Generic Disk Log", value=True)
-                        ui.switch("Unique Disk Log", value=False)
-                        ui.switch("Status Code", value=True)
-                        ui.switch("Latency", value=False)
-                        ui.switch("Response Body", value=False)
+                        for label, option in (
+                            ("Console Logs", OutputOption.CONSOLE_LOGS),
+                            ("Generic Disk Log", OutputOption.GENERIC_DISK_LOG),
+                            ("Unique Disk Log", OutputOption.UNIQUE_DISK_LOG),
+                            ("Status Code", OutputOption.STATUS_CODE),
+                            ("Latency", OutputOption.LATENCY),
+                            ("Response Body", OutputOption.RESPONSE_BODY),
+                        ):
+                            ui.switch(
+                                label,
+                                value=config.output.is_enabled(option),
+                                on_change=autosaved(
+                                    config,
+                                    lambda value, option=option: config.output.set_enabled(
+                                        option, value.value
+                                    ),
+                                ),
+                            )
+                        ui.label(
+                            "Latency is split in connect (including DNS), TLS, time to first "
+                            "byte and body read, reported as p50/p90/p99/p99.9 and max"
+                        )
 
                 with ui.card_section():
                     with ui.column():
-                        ui.markdown("###### Response Body Format")
-                        ui.label("Coming soon...")
+                        ui.markdown("###### Response Bodies")
+                        ui.label("Bodies are streamed to one file per request in the logs folder")
+                        ui.number(
+                            "Store 1 in N bodies",
+                            value=config.output.body_sample_every,
+                            min=1,
+                            step=1,
+                            precision=0,
+                            format="%.0f",
+                            on_change=autosaved(
+                                config,
+                                lambda value: config.output.set_body_sample_every(
+                                    value.value or 1
+                                ),
+                            ),
+                        )
+                        ui.number(
+                            "Max bytes per body (0 for no limit)",
+                            value=config.output.body_max_bytes,
+                            min=0,
+                            step=1024,
+                            precision=0,
+                            format="%.0f",
+                            on_change=autosaved(
+                                config,
+                                lambda value: config.output.set_body_max_bytes(value.value or 0),
+                            ),
+                        )
 
-        ui.button("Save", on_click=partial(update_config_and_refresh_list, config))
+                with ui.card_section():
+                    with ui.column():
+                        ui.markdown("###### Response Body Format")
+                        ui.label("Fields extracted from JSON bodies into the logs, one per line")
+                        ui.textarea(
+                            "Projection",
+                            placeholder="$.data[*].id",
+                            value=config.output.body_projection,
+                            validation={"Invalid projection": is_valid_projection},
+                            on_change=autosaved(
+                                config,
+                                lambda value: config.output.set_body_projection(value.value),
+                            ),
+                        )
+
+        with ui.row():
+            ui.button("Save", on_click=partial(update_config_and_refresh_list, config))
+            ui.button("Run", on_click=partial(live_run.run_config, config))
+            ui.button("Run load test", on_click=partial(live_run.run_config, config, load=True))
+
+        live_run.build_live_panel()
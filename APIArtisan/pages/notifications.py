@@ -0,0 +1,14 @@
+from nicegui import ui
+
+from ..models.outcome import Outcome
+
+
+def notify_outcome(outcome: Outcome, success_type: str = "positive") -> None:
+    """
+    Tell the user how storing or deleting a model went.
+
+    Args:
+        outcome (Outcome): What the model reported.
+        success_type (str): The notification type used when it succeeded.
+    """
+    ui.notify(outcome.message, type=success_type if outcome.ok else "negative")
@@ -1,7 +1,9 @@
 from typing import Dict
 from datetime import datetime
+from functools import partial
 from nicegui import ui
 
+from . import live_run
 from .base_page import BasePage
 from .about import AboutPage
 from .homepage import HomePage
@@ -9,6 +11,11 @@ from .secrets import SecretsPage
 from .side_menu import SideMenu
 
 
+def tick(clock: ui.label) -> None:
+    clock.set_text(f"{datetime.now():%X} UTC")
+    live_run.tick()
+
+
 def create_pages() -> None:
     """
     Creates and configures the pages for the application.
@@ -22,10 +29,13 @@ def create_pages() -> None:
         "Secrets": SecretsPage(),
     }
 
+    ui.add_head_html(live_run.CHART_SCRIPT)
+
     with ui.header().classes(replace="row items-center"):
         ui.space()
         timer = ui.label()
-        ui.timer(1.0, lambda: timer.set_text(f"{datetime.now():%X} UTC"))
+        # Also pushes the seconds the active run closed to the live panel.
+        ui.timer(1.0, partial(tick, timer))
 
         with ui.tabs() as tabs:
             for page in pages.values():
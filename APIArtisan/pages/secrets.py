@@ -3,63 +3,87 @@ from functools import partial
 from nicegui import ui
 
 from ..utils import storage
+from ..utils.storage import StorageChange
 from ..models.secret import Secret
 from .base_page import BasePage
+from .notifications import notify_outcome
+from .virtual_list import VirtualList
+
+
+async def delete_secret_func(secret: Secret):
+    with ui.dialog() as confirm, ui.card():
+        ui.label(f"Are you sure you want to delete {secret.name}?")
+        with ui.row():
+            ui.button("Yes delete", on_click=lambda: confirm.submit("Yes"))
+            ui.space()
+            ui.button("Cancel", color="red", on_click=lambda: confirm.submit("No"))
+
+    result = await confirm
+    if result == "Yes":
+        notify_outcome(await secret.delete())
+        confirm.clear()
+    else:
+        confirm.clear()
+
+
+async def set_availability_func(secret: Secret, value):
+    notify_outcome(await secret.set_availability(value.value), "info")
+
+
+def peek_secret_func(secret: Secret):
+    ui.notify(secret.value, type="info")
+
+
+def build_secret_row(name: str, secret_dict: dict):
+    secret = Secret.from_dict(secret_dict)
+    peek_secret = partial(peek_secret_func, secret)
+    delete_secret = partial(delete_secret_func, secret)
+    set_availability = partial(set_availability_func, secret)
+
+    with ui.item():
+        with ui.card():
+            ui.markdown(f"##### {secret.name}")
+            ui.markdown(secret.description)
+            with ui.row():
+                ui.switch(
+                    "Available",
+                    value=secret.available,
+                    on_change=set_availability,
+                )
+                ui.button(
+                    "Peek 👀",
+                    color="blue",
+                    on_click=peek_secret,
+                )
+                ui.button(
+                    "Delete",
+                    color="red",
+                    on_click=delete_secret,
+                )
+
+
+secrets_list = VirtualList(
+    build_secret_row,
+    "You don't have any secrets yet, create one using the button above!",
+)
 
 
-@ui.refreshable
 def build_secrets_list():
-    secrets_dicts = storage.secrets.read_all_from_file()
-    secrets = [Secret(**secret_dict) for secret_dict in secrets_dicts]
-
-    if len(secrets) == 0:
-        ui.markdown("You don't have any secrets yet, create one using the button above!")
-
-    with ui.list():
-        for secret in secrets:
-
-            async def delete_secret_func(secret: Secret):
-                with ui.dialog() as confirm, ui.card():
-                    ui.label(f"Are you sure you want to delete {secret.name}?")
-                    with ui.row():
-                        ui.button("Yes delete", on_click=lambda: confirm.submit("Yes"))
-                        ui.space()
-                        ui.button("Cancel", color="red", on_click=lambda: confirm.submit("No"))
-
-                result = await confirm
-                if result == "Yes":
-                    await secret.delete()
-                    confirm.clear()
-                    build_secrets_list.refresh()
-                else:
-                    confirm.clear()
-
-            def peek_secret_func(secret: Secret):
-                ui.notify(secret.value, type="info")
-
-            peek_secret = partial(peek_secret_func, secret)
-            delete_secret = partial(delete_secret_func, secret)
-
-            with ui.item():
-                with ui.card():
-                    ui.markdown(f"##### {secret.name}")
-                    ui.markdown(secret.description)
-                    with ui.row():
-                        ui.switch(
-                            "Available",
-                            value=secret.available,
-                            on_change=secret.set_availability,
-                        )
-                        ui.button(
-                            "Peek 👀",
-                            color="blue",
-                            on_click=peek_secret,
-                        )
-                        ui.button(
-                            "Delete",
-                            color="red",
-                            on_click=delete_secret,
-                        )
+    secrets_list.build()
+    ui.timer(0, sync_secrets_list, once=True)
+
+
+async def sync_secrets_list():
+    secrets_dicts = await storage.secrets.read_all_from_file_async()
+    secrets_list.set_items({secret_dict["name"]: secret_dict for secret_dict in secrets_dicts})
+
+
+def apply_secret_changes(changes: list[StorageChange]):
+    for change in changes:
+        if change.deleted:
+            secrets_list.remove(change.name)
+        else:
+            secrets_list.upsert(change.name, change.data)
 
 
 def build_secret_dialog():
@@ -99,8 +123,7 @@ def build_secret_dialog():
                     description=description.value,
                     available=available.value,
                 )
-                await secret.save()
-                build_secrets_list.refresh()
+                notify_outcome(await secret.save())
                 dialog.close()
             else:
                 ui.notify("Validation error", type="negative")
@@ -122,3 +145,4 @@ class SecretsPage(BasePage):
             ui.button("Create a new secret", on_click=build_secret_dialog)
             ui.separator()
             build_secrets_list()
+            storage.secrets.subscribe(apply_secret_changes)
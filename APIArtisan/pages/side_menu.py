@@ -1,10 +1,16 @@
 from functools import partial
+from typing import Optional
+
 from nicegui import ui
 
 from .base_page import BasePage
+from .virtual_list import VirtualList
 from ..utils import storage
+from ..utils.search_index import configs_index
+from ..utils.storage import StorageChange
 from ..models.config import Config
 from .main_config import generate_main_config_page
+from .notifications import notify_outcome
 
 
 async def delete_config_func(config: Config, main_body: ui.card):
@@ -17,42 +23,71 @@ async def delete_config_func(config: Config, main_body: ui.card):
 
     result = await confirm
     if result == "Yes":
-        await config.delete()
+        notify_outcome(await config.delete())
         confirm.clear()
         main_body.clear()
-        build_configs_list.refresh()
     else:
         confirm.clear()
 
 
-@ui.refreshable
+def build_config_row(name: str, config_dict: dict, main_body: ui.card):
+    config = Config.from_dict(config_dict)
+    delete_config = partial(delete_config_func, config, main_body)
+    view_config = partial(generate_main_config_page, config, main_body)
+
+    ui.separator()
+    with ui.item():
+        with ui.item_section():
+            ui.markdown(f"##### {config.name}")
+            with ui.row():
+                ui.button(
+                    "View",
+                    on_click=view_config,
+                )
+                ui.button(
+                    "Delete",
+                    color="red",
+                    on_click=delete_config,
+                )
+
+
+configs_list: Optional[VirtualList] = None
+
+
 def build_configs_list(main_body: ui.card):
-    configs_dicts = storage.configs.read_all_from_file()
-    configs = [Config.from_dict(config_dict) for config_dict in configs_dicts]
-
-    with ui.list().classes("w-full"):
-        if len(configs) == 0:
-            ui.markdown(
-                "You don't have any configurations yet, create one using the button above!"
-            )
-        for config in configs:
-            delete_config = partial(delete_config_func, config, main_body)
-            view_config = partial(generate_main_config_page, config, main_body)
-
-            ui.separator()
-            with ui.item():
-                with ui.item_section():
-                    ui.markdown(f"##### {config.name}")
-                    with ui.row():
-                        ui.button(
-                            "View",
-                            on_click=view_config,
-                        )
-                        ui.button(
-                            "Delete",
-                            color="red",
-                            on_click=delete_config,
-                        )
+    global configs_list
+    configs_list = VirtualList(
+        partial(build_config_row, main_body=main_body),
+        "You don't have any configurations yet, create one using the button above!",
+    )
+    configs_list.build()
+    ui.timer(0, sync_configs_list, once=True)
+
+
+async def sync_configs_list():
+    configs_dicts = await storage.configs.read_all_from_file_async()
+    configs_index.rebuild(configs_dicts)
+    configs_list.set_items({config_dict["name"]: config_dict for config_dict in configs_dicts})
+
+
+def apply_config_changes(changes: list[StorageChange]):
+    configs_index.apply(changes)
+    for change in changes:
+        if change.deleted:
+            configs_list.remove(change.name)
+        else:
+            configs_list.upsert(change.name, change.data)
+    if search_query:
+        configs_list.set_filter(configs_index.search(search_query))
+
+
+search_query = ""
+
+
+def search_configs(query: str):
+    global search_query
+    search_query = query or ""
+    configs_list.set_filter(configs_index.search(search_query))
 
 
 def build_configuration_dialog():
@@ -71,8 +106,7 @@ def build_configuration_dialog():
                 config = Config(
                     name=name.value,
                 )
-                await config.save()
-                build_configs_list.refresh()
+                notify_outcome(await config.save())
                 dialog.close()
             else:
                 ui.notify("Validation error", type="negative")
@@ -94,5 +128,11 @@ class SideMenu(BasePage):
         ui.markdown(f"##### {self.HEADER()}")
 
         ui.button("Create a configuration", on_click=build_configuration_dialog)
+        ui.input(
+            "Search",
+            placeholder="name, or method:POST host:api.example",
+            on_change=lambda value: search_configs(value.value),
+        ).props("clearable").classes("w-full")
 
         build_configs_list(self.main_body)
+        storage.configs.subscribe(apply_config_changes)
@@ -0,0 +1,149 @@
+from bisect import bisect_left
+from typing import Any, Callable, Optional
+
+from nicegui import ui
+
+from ..constants import globals
+
+MISSING = object()
+
+
+class VirtualList:
+    """
+    A list that only renders a window of its rows and updates them by key.
+
+    Rows are kept sorted by key and only the first `window` of them exist in
+    the page, growing a page at a time with "Show more". Adding, changing or
+    removing an item touches that item's row alone, instead of rebuilding
+    every row like a refreshable would. A filter narrows the rows down to a
+    set of keys, such as the results of a search.
+    """
+
+    def __init__(
+        self,
+        render_row: Callable[[str, Any], None],
+        empty_message: str,
+        page_size: int = globals.LIST_PAGE_SIZE,
+    ):
+        """
+        Initializes a VirtualList object.
+
+        Args:
+            render_row (Callable[[str, Any], None]): Builds the elements of one row from its
+                key and data, inside the row's container.
+            empty_message (str): The markdown shown when there are no items.
+            page_size (int): How many rows are rendered at first and added by "Show more".
+        """
+        self.render_row = render_row
+        self.empty_message = empty_message
+        self.page_size = page_size
+        self.window = page_size
+        self._items: dict[str, Any] = {}
+        self._keys: list[str] = []
+        self._filter: Optional[set[str]] = None
+        self._rows: dict[str, ui.element] = {}
+
+    def build(self) -> None:
+        self._empty = ui.markdown(self.empty_message)
+        self._container = ui.list().classes("w-full")
+        self._more = ui.button("Show more", on_click=self.show_more).props("flat")
+        self._update_controls()
+
+    def set_items(self, items: dict[str, Any]) -> None:
+        """
+        Replace the items, only updating the rows of items that were added, changed or removed.
+
+        Args:
+            items (dict[str, Any]): The data of every item by key.
+        """
+        for key in self._items.keys() - items.keys():
+            self.remove(key)
+        for key, data in items.items():
+            self.upsert(key, data)
+
+    def upsert(self, key: str, data: Any) -> None:
+        """
+        Add an item, or update its row if its data changed.
+        """
+        previous = self._items.get(key, MISSING)
+        if previous is data or previous == data:
+            return
+        self._items[key] = data
+
+        if previous is MISSING:
+            if self._filter is not None and key not in self._filter:
+                self._update_controls()
+                return
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            if position < self.window:
+                self._render(key, position)
+                if len(self._keys) > self.window:
+                    self._rows.pop(self._keys[self.window]).delete()
+        elif key in self._rows:
+            row = self._rows[key]
+            row.clear()
+            with row:
+                self.render_row(key, data)
+        self._update_controls()
+
+    def remove(self, key: str) -> None:
+        """
+        Remove an item and its row, pulling the next row into the window if there is one.
+        """
+        if self._items.pop(key, MISSING) is MISSING:
+            return
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+
+        row = self._rows.pop(key, None)
+        if row is not None:
+            row.delete()
+            if len(self._keys) >= self.window:
+                self._render(self._keys[self.window - 1], self.window - 1)
+        self._update_controls()
+
+    def set_filter(self, keys: Optional[set[str]]) -> None:
+        """
+        Only show the items with the given keys, keeping the rows that stay visible.
+
+        Args:
+            keys (set[str] | None): The keys to show, or None to show every item.
+        """
+        self._filter = keys
+        if keys is None:
+            self._keys = sorted(self._items)
+        else:
+            self._keys = sorted(key for key in keys if key in self._items)
+        self.window = self.page_size
+
+        visible = self._keys[: self.window]
+        for key in self._rows.keys() - set(visible):
+            self._rows.pop(key).delete()
+        for position, key in enumerate(visible):
+            row = self._rows.get(key)
+            if row is None:
+                self._render(key, position)
+            else:
+                row.move(self._container, target_index=position)
+        self._update_controls()
+
+    def show_more(self) -> None:
+        start = self.window
+        self.window += self.page_size
+        for position, key in enumerate(self._keys[start : self.window], start):
+            self._render(key, position)
+        self._update_controls()
+
+    def _render(self, key: str, position: int) -> None:
+        with self._container:
+            row = ui.element("div").classes("w-full")
+            with row:
+                self.render_row(key, self._items[key])
+        row.move(self._container, target_index=position)
+        self._rows[key] = row
+
+    def _update_controls(self) -> None:
+        self._empty.set_visibility(not self._items)
+        self._more.set_visibility(len(self._keys) > self.window)
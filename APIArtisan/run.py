@@ -0,0 +1,225 @@
+import argparse
+import asyncio
+import os
+import sys
+from functools import partial
+from typing import Optional
+
+import orjson
+
+from .constants import execution_constants, globals
+from .execution import logs
+from .execution.engine import ExecutionResult, Executor
+from .execution.feeds import open_feed
+from .models.config import Config
+from .models.output_config import OutputOption
+from .utils import storage
+
+# Only the execution path is imported here, never the pages or nicegui, and
+# httpx, load tests and worker processes only once a run needs them, so that
+# a headless run starts quickly.
+
+
+def load_configs(targets: list[str]) -> list[Config]:
+    """
+    Load the configs to run.
+
+    Args:
+        targets (list[str]): The names of stored configs, paths of config JSON files,
+            or directories whose JSON files are all run, in name order.
+
+    Raises:
+        FileNotFoundError: If a target is neither a stored config nor a path.
+        ValueError: If a config file is not valid.
+
+    Returns:
+        list[Config]: The configs, in the order given.
+    """
+    configs = []
+    backend_chosen = False
+    for target in targets:
+        if os.path.isdir(target):
+            paths = [
+                os.path.join(target, file_name)
+                for file_name in sorted(os.listdir(target))
+                if file_name.endswith(".json")
+            ]
+        elif os.path.isfile(target):
+            paths = [target]
+        else:
+            if not backend_chosen:
+                storage.use_configured_backend()
+                backend_chosen = True
+            try:
+                data = storage.configs.read_from_file(f"{target}.json")
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Config {target} does not exist!") from None
+            configs.append(Config.from_dict(data))
+            continue
+
+        for path in paths:
+            with open(path, "rb") as f:
+                try:
+                    configs.append(Config.from_json(f.read()))
+                except (orjson.JSONDecodeError, KeyError) as e:
+                    raise ValueError(f"{path} is not a valid config: {e!r}") from None
+    return configs
+
+
+def print_result(config: Config, result: ExecutionResult) -> None:
+    outcome = result.status_code if result.error is None else result.error
+    status = "ok" if result.ok else "failed"
+    print(f"{config.name} #{result.index} {status} {outcome} {result.elapsed * 1000:.1f}ms")
+
+
+async def run_configs(
+    configs: list[Config],
+    repeat: int,
+    concurrency: int,
+    timeout: float,
+    quiet: bool,
+    processes: int = 1,
+    load: bool = False,
+) -> bool:
+    """
+    Run configs one after the other through a shared executor, printing a summary of each.
+
+    Args:
+        configs (list[Config]): The configs to run.
+        repeat (int): How many requests to send for a config without a variable feed.
+        concurrency (int): The maximum number of requests in flight at once, per process.
+        timeout (float): The timeout in seconds for each request.
+        quiet (bool): Whether to skip the per-request lines of configs with console logs.
+        processes (int): How many worker processes share each config's requests, 1 to
+            send them from this process.
+        load (bool): Whether to run each config as a load test following its load profile,
+            instead of sending `repeat` requests.
+
+    Returns:
+        bool: Whether every request of every config succeeded.
+    """
+    if processes > 1:
+        from .execution.processes import run_in_processes
+    if load:
+        from .execution.load import run_load
+
+    succeeded = True
+    async with Executor(concurrency, timeout) as executor:
+        for config in configs:
+            on_result = None
+            if config.output.is_enabled(OutputOption.CONSOLE_LOGS) and not quiet:
+                on_result = partial(print_result, config)
+            try:
+                if processes > 1:
+                    summary = await run_in_processes(
+                        config, processes, repeat, concurrency, timeout, on_result
+                    )
+                else:
+                    feed_path = config.variables.feed_path
+                    rows = open_feed(feed_path) if feed_path else None
+                    if load:
+                        summary = await run_load(executor, config, rows, on_result)
+                    else:
+                        summary = await executor.run(
+                            config, rows, repeat=repeat, on_result=on_result
+                        )
+            except (ValueError, OSError) as e:
+                print(f"{config.name} could not run: {e}", file=sys.stderr)
+                succeeded = False
+                continue
+            print(orjson.dumps({"config": config.name, **summary.to_dict()}).decode())
+            succeeded = succeeded and summary.succeeded == summary.total
+    return succeeded
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Run stored configs without the UI, e.g. from cron, CI or a container.
+
+    Returns:
+        int: The exit code, 0 if every request succeeded, 1 if any failed and 2 if a
+            config couldn't be loaded.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m APIArtisan.run",
+        description=f"Run {globals.APP_TITLE} configs headless.",
+    )
+    parser.add_argument(
+        "targets",
+        nargs="+",
+        metavar="CONFIG",
+        help="the name of a stored config, a config JSON file or a directory of them",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=1,
+        help="requests to send for configs without a variable feed (default: 1)",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=execution_constants.DEFAULT_CONCURRENCY,
+        help="requests in flight at once, per process "
+        f"(default: {execution_constants.DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        default=1,
+        help="worker processes sharing each config's requests, 0 for one per CPU (default: 1)",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=execution_constants.DEFAULT_TIMEOUT,
+        help=f"seconds per request (default: {execution_constants.DEFAULT_TIMEOUT:g})",
+    )
+    parser.add_argument(
+        "-l",
+        "--load",
+        action="store_true",
+        help="run each config as a load test following its load profile, sending requests "
+        "on schedule whether or not earlier ones completed",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="only print the summary of each config"
+    )
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.processes < 0:
+        parser.error("--processes can't be negative")
+    processes = args.processes or os.cpu_count() or 1
+    if args.load and processes > 1:
+        parser.error("--load runs in a single process")
+
+    try:
+        configs = load_configs(args.targets)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    try:
+        succeeded = asyncio.run(
+            run_configs(
+                configs,
+                args.repeat,
+                args.concurrency,
+                args.timeout,
+                args.quiet,
+                processes,
+                args.load,
+            )
+        )
+    finally:
+        logs.close_shared_log()
+    return 0 if succeeded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,13 @@
-from . import screen_size, storage
+import importlib
 
-__all__ = ["screen_size", "storage"]
+__all__ = [
+    "screen_size",
+    "storage",
+]
+
+
+def __getattr__(name: str):
+    # Submodules are imported on first use, so importing one doesn't import the others.
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
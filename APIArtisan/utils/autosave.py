@@ -0,0 +1,74 @@
+import asyncio
+import sys
+from typing import TYPE_CHECKING, Optional
+
+from ..constants import storage_constants
+from . import storage
+
+if TYPE_CHECKING:
+    from ..models.config import Config
+
+
+class Autosave:
+    """
+    Writes edited configs back to storage from a background task.
+
+    Edits only mark their config as dirty, so an editor handler never waits
+    on the disk. Once per interval the task writes every dirty config once,
+    however many edits it received, serializing it at that moment.
+    """
+
+    def __init__(self, interval: float = storage_constants.AUTOSAVE_INTERVAL):
+        """
+        Initializes an Autosave object.
+
+        Args:
+            interval (float): The seconds to gather edits for before writing them.
+        """
+        self.interval = interval
+        self._pending: dict[str, "Config"] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def schedule(self, config: "Config") -> None:
+        """
+        Mark a config as edited, it will be written at the end of the current interval.
+
+        Args:
+            config (Config): The edited config.
+        """
+        self._pending[config.name] = config
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def discard(self, config: "Config") -> None:
+        """
+        Forget the pending edits of a config, e.g. because it was just saved or deleted.
+        """
+        self._pending.pop(config.name, None)
+
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write every config with pending edits now.
+
+        Configs that no longer exist in storage are dropped. Configs that
+        could not be written are kept for the next interval.
+        """
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            for name, config in pending.items():
+                try:
+                    await storage.configs.update_file(config.to_json(), name)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    print(f"Autosave of {name} failed: {e!r}", file=sys.stderr)
+                    self._pending.setdefault(name, config)
+
+
+configs = Autosave()
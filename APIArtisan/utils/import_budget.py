@@ -0,0 +1,67 @@
+import math
+import subprocess
+import sys
+
+from ..constants import import_constants
+
+MEASURE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "print(time.perf_counter() - start)\n"
+    "print(' '.join(sys.modules))\n"
+)
+
+
+def measure(
+    module: str, runs: int = import_constants.IMPORT_BUDGET_RUNS
+) -> tuple[float, set[str]]:
+    """
+    Time importing a module in fresh interpreters.
+
+    Args:
+        module (str): The dotted name of the module.
+        runs (int): How many interpreters to start, the fastest import counts.
+
+    Raises:
+        subprocess.CalledProcessError: If the module can't be imported.
+
+    Returns:
+        tuple[float, set[str]]: The seconds the import took and the top-level packages it loaded.
+    """
+    best = math.inf
+    packages: set[str] = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE.format(module=module)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+        best = min(best, float(output[0]))
+        packages = {name.split(".")[0] for name in output[1].split()}
+    return best, packages
+
+
+def main() -> int:
+    """
+    Check every module of `IMPORT_BUDGETS` against its budget and the forbidden packages.
+
+    Returns:
+        int: The exit code, 1 if any module is over budget or imports a forbidden package.
+    """
+    failed = False
+    for module, budget in import_constants.IMPORT_BUDGETS.items():
+        seconds, packages = measure(module)
+        forbidden = sorted(packages.intersection(import_constants.IMPORT_FORBIDDEN))
+        within = seconds * 1000 <= budget and not forbidden
+        line = f"{'ok' if within else 'FAIL'} {module} {seconds * 1000:.1f}ms of {budget}ms"
+        if forbidden:
+            line += f", imports {', '.join(forbidden)}"
+        print(line)
+        failed = failed or not within
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
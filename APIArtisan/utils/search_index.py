@@ -0,0 +1,199 @@
+import re
+from bisect import bisect_left
+from difflib import get_close_matches
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+from .storage import StorageChange
+
+FIELDS = ("name", "host", "path", "method", "header", "auth")
+TOKEN_SPLIT = re.compile(r"[^0-9a-z{}]+")
+FUZZY_CUTOFF = 0.75
+
+
+def tokenize(text: str) -> set[str]:
+    """
+    Split text into lowercase tokens, keeping the whole text as a token as well.
+    """
+    text = text.lower().strip()
+    if not text:
+        return set()
+    tokens = {token for token in TOKEN_SPLIT.split(text) if token}
+    tokens.add(text)
+    return tokens
+
+
+def config_tokens(config_dict: dict) -> dict[str, set[str]]:
+    """
+    The searchable tokens of a stored config, by field.
+
+    Args:
+        config_dict (dict): A config as stored.
+
+    Returns:
+        dict[str, set[str]]: The tokens of each field.
+    """
+    http_config = config_dict.get("http_config", {})
+    try:
+        url = urlsplit(http_config.get("url", ""))
+        host, path = url.netloc, url.path
+    except ValueError:
+        host, path = "", http_config.get("url", "")
+
+    return {
+        "name": tokenize(config_dict.get("name", "")),
+        "host": tokenize(host),
+        "path": tokenize(path),
+        "method": tokenize(str(http_config.get("method", ""))),
+        "header": set().union(*(tokenize(key) for key in http_config.get("headers", {}))),
+        "auth": tokenize(str(config_dict.get("auth_type", ""))),
+    }
+
+
+class FieldIndex:
+    """
+    The postings of one field: which entries contain each token.
+    """
+
+    def __init__(self):
+        self.postings: dict[str, set[str]] = {}
+        self._sorted: Optional[list[str]] = None
+
+    def add(self, token: str, key: str) -> None:
+        keys = self.postings.get(token)
+        if keys is None:
+            self.postings[token] = {key}
+            self._sorted = None
+        else:
+            keys.add(key)
+
+    def discard(self, token: str, key: str) -> None:
+        keys = self.postings.get(token)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self.postings[token]
+            self._sorted = None
+
+    @property
+    def tokens(self) -> list[str]:
+        if self._sorted is None:
+            self._sorted = sorted(self.postings)
+        return self._sorted
+
+    def prefix(self, term: str) -> set[str]:
+        """
+        Find the entries with a token starting with the term.
+
+        Args:
+            term (str): A lowercase search term.
+
+        Returns:
+            set[str]: The keys of the matching entries.
+        """
+        tokens = self.tokens
+        matches: set[str] = set()
+        position = bisect_left(tokens, term)
+        while position < len(tokens) and tokens[position].startswith(term):
+            matches |= self.postings[tokens[position]]
+            position += 1
+        return matches
+
+    def fuzzy(self, term: str) -> set[str]:
+        """
+        Find the entries with a token close to the term, to allow for typos.
+        """
+        matches: set[str] = set()
+        for token in get_close_matches(term, self.tokens, n=5, cutoff=FUZZY_CUTOFF):
+            matches |= self.postings[token]
+        return matches
+
+
+class ConfigIndex:
+    """
+    An in-memory inverted index over stored configs.
+
+    Free text terms match the start of any token in any field and fall back to
+    close matches for typos. Terms written as `field:value` only search that
+    field, the fields being name, host, path, method, header and auth. Every
+    term has to match for a config to be returned.
+    """
+
+    def __init__(self):
+        self.fields = {field: FieldIndex() for field in FIELDS}
+        self._tokens: dict[str, dict[str, set[str]]] = {}
+
+    def add(self, key: str, config_dict: dict) -> None:
+        """
+        Index a config, replacing what was indexed for it before.
+
+        Args:
+            key (str): The name the config is stored under.
+            config_dict (dict): The config as stored.
+        """
+        self.remove(key)
+        tokens = config_tokens(config_dict)
+        for field, field_tokens in tokens.items():
+            field_index = self.fields[field]
+            for token in field_tokens:
+                field_index.add(token, key)
+        self._tokens[key] = tokens
+
+    def remove(self, key: str) -> None:
+        tokens = self._tokens.pop(key, None)
+        if tokens is None:
+            return
+        for field, field_tokens in tokens.items():
+            field_index = self.fields[field]
+            for token in field_tokens:
+                field_index.discard(token, key)
+
+    def rebuild(self, config_dicts: Iterable[dict]) -> None:
+        self.fields = {field: FieldIndex() for field in FIELDS}
+        self._tokens = {}
+        for config_dict in config_dicts:
+            self.add(config_dict["name"], config_dict)
+
+    def apply(self, changes: list[StorageChange]) -> None:
+        """
+        Apply the changes reported by the configs storage.
+        """
+        for change in changes:
+            if change.deleted:
+                self.remove(change.name)
+            else:
+                self.add(change.name, change.data)
+
+    def search(self, query: str) -> Optional[set[str]]:
+        """
+        Find the configs matching a query.
+
+        Args:
+            query (str): Free text terms and `field:value` filters, e.g. `method:post host:api.foo`.
+
+        Returns:
+            set[str] | None: The names of the matching configs, or None if the query is empty.
+        """
+        results: Optional[set[str]] = None
+        for term in query.lower().split():
+            field, separator, value = term.partition(":")
+            if separator and field in self.fields:
+                if not value:
+                    continue
+                term = value
+                field_indexes = [self.fields[field]]
+            else:
+                field_indexes = list(self.fields.values())
+
+            matches = set().union(*(field_index.prefix(term) for field_index in field_indexes))
+            if not matches:
+                matches = set().union(*(field_index.fuzzy(term) for field_index in field_indexes))
+
+            results = matches if results is None else results & matches
+            if not results:
+                return set()
+        return results
+
+
+configs_index = ConfigIndex()
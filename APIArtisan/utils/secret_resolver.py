@@ -0,0 +1,98 @@
+from typing import Any, Iterable
+
+from ..models.secret import referenced_secret
+from . import storage
+from .storage import StorageChange
+
+
+class SecretResolver:
+    """
+    Resolves secret references to their values, reading each secret once.
+
+    A resolver is meant to live as long as a run, so that every request of the
+    run shares the values read when it started, or as long as a UI session,
+    in which case it is kept current by subscribing `apply` to the secrets storage.
+    """
+
+    def __init__(self):
+        self._values: dict[str, str] = {}
+
+    def _read(self, data: dict) -> str:
+        if not data.get("available", True):
+            raise ValueError(f"Secret {data['name']} is not available!")
+        value = data.get("value", "")
+        self._values[data["name"]] = value
+        return value
+
+    def value_of(self, name: str) -> str:
+        """
+        Get the value of a secret.
+
+        Args:
+            name (str): The name of the secret.
+
+        Raises:
+            ValueError: If there is no secret with this name, or it is not available.
+
+        Returns:
+            str: The value of the secret.
+        """
+        value = self._values.get(name)
+        if value is not None:
+            return value
+        try:
+            return self._read(storage.secrets.read_from_file(f"{name}.json"))
+        except FileNotFoundError:
+            raise ValueError(f"Secret {name} does not exist!") from None
+
+    async def prefetch(self, values: Iterable[Any]) -> None:
+        """
+        Read the secrets referenced by some values without blocking the event loop.
+
+        Args:
+            values (Iterable[Any]): Stored values, plaintext or references.
+
+        Raises:
+            ValueError: If a referenced secret does not exist or is not available.
+        """
+        for value in values:
+            name = referenced_secret(value)
+            if name is None or name in self._values:
+                continue
+            try:
+                self._read(await storage.secrets.read_from_file_async(f"{name}.json"))
+            except FileNotFoundError:
+                raise ValueError(f"Secret {name} does not exist!") from None
+
+    def resolve(self, value: Any) -> str:
+        """
+        Args:
+            value (Any): A stored value, plaintext or a reference.
+
+        Raises:
+            ValueError: If the value references a secret that does not exist or is not
+                available.
+
+        Returns:
+            str: The plaintext value.
+        """
+        name = referenced_secret(value)
+        if name is None:
+            return "" if value is None else str(value)
+        return self.value_of(name)
+
+    def resolve_all(self, values: dict) -> dict[str, str]:
+        """
+        Resolve every value of a dictionary, such as a config's auth details.
+        """
+        return {key: self.resolve(value) for key, value in values.items()}
+
+    def apply(self, changes: list[StorageChange]) -> None:
+        """
+        Forget the values of the secrets that were changed or deleted.
+        """
+        for change in changes:
+            self._values.pop(change.name, None)
+
+
+session_secrets = SecretResolver()
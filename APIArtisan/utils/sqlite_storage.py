@@ -0,0 +1,370 @@
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional
+
+import orjson
+
+from ..constants import storage_constants
+from .storage import StorageChange, readers
+
+
+def directory_entries(directory: str) -> Iterator[tuple[str, str]]:
+    """
+    The entries of a file storage directory.
+
+    Args:
+        directory (str): A directory of `.json` files, one per entry.
+
+    Returns:
+        Iterator[tuple[str, str]]: Pairs of entry name and JSON data.
+    """
+    if not os.path.isdir(directory):
+        return
+    for file_name in os.listdir(directory):
+        if not file_name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, file_name), "r") as f:
+            yield file_name.removesuffix(".json"), f.read()
+
+
+class SqliteStorage:
+    """
+    A storage backend that keeps every entry of a kind in one table of a SQLite database.
+
+    It offers the same methods as `Storage`, so it can be swapped in for the
+    one-file-per-entry layout. Startup becomes a single query instead of one
+    open per file, and several writes can share one transaction. Commits run
+    in WAL mode without a sync per write, so they are cheap enough to make
+    directly from the event loop.
+
+    The first time the table is created, the entries of the file storage
+    directory are imported into it, so switching backends keeps them.
+    """
+
+    def __init__(self, database: str, table: str, seed_directory: Optional[str] = None):
+        """
+        Initializes a SqliteStorage object.
+
+        Args:
+            database (str): The path of the SQLite database file.
+            table (str): The table holding this kind of entry, e.g. `configs`.
+            seed_directory (str, optional): The file storage directory imported when the
+                table is created.
+        """
+        if not table.isidentifier():
+            raise ValueError(f"{table} is not a valid table name")
+        self.database = database
+        self.table = table
+        self.seed_directory = seed_directory
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._cache: Optional[dict[str, dict]] = None
+        self._data_version: Optional[int] = None
+        # A batch spans awaits, so it is guarded by a lock of the event loop rather
+        # than `_lock`, which only keeps the reader threads off the connection.
+        self._batch_lock = asyncio.Lock()
+        self._batch_owner: Optional[asyncio.Task] = None
+        self._pending: list[StorageChange] = []
+        self._listeners: list[Callable[[list[StorageChange]], None]] = []
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.database, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            exists = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.table,)
+            ).fetchone()
+            if exists is None:
+                connection.execute(
+                    f"CREATE TABLE {self.table} (name TEXT PRIMARY KEY, data TEXT NOT NULL)"
+                )
+                if self.seed_directory is not None:
+                    connection.executemany(
+                        f"INSERT OR REPLACE INTO {self.table} (name, data) VALUES (?, ?)",
+                        directory_entries(self.seed_directory),
+                    )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            self._cache = None
+
+    @staticmethod
+    def _name(file_name: str) -> str:
+        return file_name.removesuffix(".json")
+
+    @asynccontextmanager
+    async def batch(self) -> AsyncIterator[None]:
+        """
+        Group every write made inside the block into a single transaction.
+
+        If the block raises, none of its writes are kept. Listeners hear about
+        the writes once, when the transaction is committed. Writes from other
+        coroutines wait for the block to be over instead of joining its
+        transaction, and a block nested in another joins the outer one.
+        """
+        task = asyncio.current_task()
+        if self._batch_owner is task:
+            yield
+            return
+        async with self._batch_lock:
+            self._batch_owner = task
+            try:
+                yield
+            except BaseException:
+                with self._lock:
+                    self.connection.rollback()
+                    self._cache = None
+                    self._pending = []
+                raise
+            else:
+                with self._lock:
+                    self.connection.commit()
+            finally:
+                self._batch_owner = None
+        self._flush()
+
+    async def _wait_for_batch(self) -> None:
+        while self._batch_owner is not None and self._batch_owner is not asyncio.current_task():
+            async with self._batch_lock:
+                pass
+
+    def _commit(self, change: StorageChange) -> None:
+        self._pending.append(change)
+        if self._batch_owner is None:
+            self.connection.commit()
+
+    def _exists(self, name: str) -> bool:
+        row = self.connection.execute(
+            f"SELECT 1 FROM {self.table} WHERE name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    def _write(self, json_data: str, name: str, must_exist: Optional[bool]) -> None:
+        with self._lock:
+            if must_exist is not None and self._exists(name) != must_exist:
+                if must_exist:
+                    raise FileNotFoundError(f"{name} does not exist!")
+                raise FileExistsError(f"{name} already exists!")
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} (name, data) VALUES (?, ?)",
+                (name, json_data),
+            )
+            data = orjson.loads(json_data)
+            self._commit(StorageChange(name, data))
+            if self._cache is not None:
+                self._cache[name] = data
+        self._flush()
+
+    def _delete(self, name: str) -> None:
+        with self._lock:
+            cursor = self.connection.execute(f"DELETE FROM {self.table} WHERE name = ?", (name,))
+            if cursor.rowcount == 0:
+                raise FileNotFoundError(f"{name} does not exist!")
+            self._commit(StorageChange(name, None))
+            if self._cache is not None:
+                self._cache.pop(name, None)
+        self._flush()
+
+    async def write_to_file(self, json: str, name_of_file: str) -> None:
+        """
+        Store a new entry.
+
+        Raises:
+            FileExistsError: If an entry with the same name already exists.
+        """
+        await self._wait_for_batch()
+        self._write(json, name_of_file, False)
+
+    async def update_file(self, json: str, name_of_file: str) -> None:
+        """
+        Replace an existing entry.
+
+        Raises:
+            FileNotFoundError: If there is no entry with this name.
+        """
+        await self._wait_for_batch()
+        self._write(json, name_of_file, True)
+
+    async def delete_file(self, name: str) -> None:
+        """
+        Delete an entry.
+
+        Raises:
+            FileNotFoundError: If there is no entry with this name.
+        """
+        await self._wait_for_batch()
+        self._delete(name)
+
+    def _load(self) -> dict[str, dict]:
+        with self._lock:
+            connection = self.connection
+            data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+            if self._cache is None or data_version != self._data_version:
+                rows = connection.execute(f"SELECT name, data FROM {self.table}")
+                self._cache = {name: orjson.loads(data) for name, data in rows}
+                self._data_version = data_version
+            return self._cache
+
+    def read_from_file(self, file_name: str) -> dict:
+        """
+        Read one entry.
+
+        Args:
+            file_name (str): The name of the entry, with or without a `.json` suffix.
+
+        Raises:
+            FileNotFoundError: If there is no entry with this name.
+
+        Returns:
+            dict: The entry.
+        """
+        name = self._name(file_name)
+        try:
+            return self._load()[name]
+        except KeyError:
+            raise FileNotFoundError(f"{name} does not exist!") from None
+
+    def read_all_from_file(self) -> list[dict]:
+        """
+        Read every entry.
+
+        Entries are loaded with a single query and kept in memory. They are
+        only loaded again when another connection has changed the database.
+
+        Returns:
+            list[dict]: Every entry.
+        """
+        return list(self._load().values())
+
+    async def read_from_file_async(self, file_name: str) -> dict:
+        """
+        Like `read_from_file`, querying the database on a reader thread if needed.
+        """
+        await asyncio.get_running_loop().run_in_executor(readers, self._load)
+        return self.read_from_file(file_name)
+
+    async def read_all_from_file_async(self) -> list[dict]:
+        """
+        Like `read_all_from_file`, querying the database on a reader thread if needed.
+        """
+        entries = await asyncio.get_running_loop().run_in_executor(readers, self._load)
+        return list(entries.values())
+
+    def _notify(self, changes: list[StorageChange]) -> None:
+        for listener in self._listeners:
+            listener(changes)
+
+    def _flush(self) -> None:
+        if self._batch_owner is None and self._pending:
+            changes, self._pending = self._pending, []
+            self._notify(changes)
+
+    def subscribe(self, listener: Callable[[list[StorageChange]], None]) -> None:
+        """
+        Register a function to call with the entries written or deleted through this object.
+        """
+        self._listeners.append(listener)
+
+    async def watch(self) -> None:
+        """
+        Nothing to watch, changes made by other processes are picked up on the next read.
+        """
+        return
+
+    async def write_many(self, entries: Iterable[tuple[str, str]]) -> int:
+        """
+        Store or replace many entries in one transaction.
+
+        Args:
+            entries (Iterable[tuple[str, str]]): Pairs of entry name and JSON data.
+
+        Returns:
+            int: The number of entries written.
+        """
+        count = 0
+        async with self.batch():
+            for name, json_data in entries:
+                self._write(json_data, name, None)
+                count += 1
+        return count
+
+    async def import_from_directory(self, directory: str) -> int:
+        """
+        Import every `.json` file of a directory, as written by the file storage.
+
+        Entries that already exist are replaced.
+
+        Args:
+            directory (str): The directory to import from.
+
+        Returns:
+            int: The number of entries imported.
+        """
+        return await self.write_many(directory_entries(directory))
+
+    def export_to_directory(self, directory: str) -> int:
+        """
+        Write every entry to a `.json` file in a directory, as read by the file storage.
+
+        Args:
+            directory (str): The directory to export to.
+
+        Returns:
+            int: The number of entries exported.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            rows = self.connection.execute(f"SELECT name, data FROM {self.table}").fetchall()
+        for name, json_data in rows:
+            with open(os.path.join(directory, f"{name}.json"), "w") as f:
+                f.write(json_data)
+        return len(rows)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Copy the configs and secrets between the file storage and the SQLite database.
+
+    Returns:
+        int: The exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m APIArtisan.utils.sqlite_storage",
+        description="Copy configs and secrets between the JSON files and the SQLite store.",
+    )
+    parser.add_argument(
+        "direction",
+        choices=["import", "export"],
+        help="import the JSON files into the database, or export the database to them",
+    )
+    args = parser.parse_args(argv)
+    for table, directory in (
+        ("configs", storage_constants.CONFIGS_DIR),
+        ("secrets", storage_constants.SECRETS_DIR),
+    ):
+        store = SqliteStorage(storage_constants.STORE_DATABASE, table)
+        if args.direction == "import":
+            count = asyncio.run(store.import_from_directory(directory))
+            print(f"Imported {count} {table} from {directory}")
+        else:
+            count = store.export_to_directory(directory)
+            print(f"Exported {count} {table} to {directory}")
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
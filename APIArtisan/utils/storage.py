@@ -1,10 +1,48 @@
+import asyncio
+import contextlib
 import os
 import json
-import aiofiles
-import aiofiles.os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional
+
+import orjson
 
 from ..constants import storage_constants
 
+if TYPE_CHECKING:
+    from watchfiles import Change
+
+# aiofiles and watchfiles are imported where they are used, so scripts and
+# worker processes that only read configs don't pay for them.
+
+readers = ThreadPoolExecutor(
+    max_workers=storage_constants.READ_WORKERS, thread_name_prefix="storage-reader"
+)
+
+
+def read_json_files(directory: str, file_names: list[str]) -> list[tuple[str, Optional[dict]]]:
+    """
+    Read and parse a chunk of JSON files, for use from the reader threads.
+
+    Args:
+        directory (str): The directory holding the files.
+        file_names (list[str]): The names of the files to read.
+
+    Raises:
+        orjson.JSONDecodeError: If a file is not valid JSON.
+
+    Returns:
+        list[tuple[str, dict | None]]: Each file name with its data, or None if it was deleted.
+    """
+    loaded = []
+    for file_name in file_names:
+        try:
+            with open(os.path.join(directory, file_name), "rb") as f:
+                loaded.append((file_name, orjson.loads(f.read())))
+        except FileNotFoundError:
+            loaded.append((file_name, None))
+    return loaded
+
 
 def create_if_doesnt_exist() -> None:
     if not os.path.exists(storage_constants.LOCAL_APP_DATA):
@@ -91,6 +129,29 @@ class Settings:
         except KeyError:
             return storage_constants.APP_DEFAULT_DEBUG
 
+    def get_storage_backend(self) -> str:
+        """
+        Get the value of the storage backend setting.
+
+        Returns:
+            str: The name of the storage backend, `files` or `sqlite`.
+        """
+        try:
+            return self.settings[storage_constants.GENERAL_KEY][
+                storage_constants.STORAGE_BACKEND_KEY
+            ]
+        except KeyError:
+            return storage_constants.STORAGE_BACKEND_DEFAULT
+
+
+class StorageChange(NamedTuple):
+    name: str
+    data: Optional[dict]
+
+    @property
+    def deleted(self) -> bool:
+        return self.data is None
+
 
 class Storage:
     """
@@ -105,6 +166,101 @@ class Storage:
             directory (str): The directory where the storage is located.
         """
         self.directory = directory
+        self._cache: dict[str, tuple[int, int, dict]] = {}
+        self._listeners: list[Callable[[list[StorageChange]], None]] = []
+        self._watching = False
+
+    def _invalidate(self, file_name: str) -> None:
+        self._cache.pop(file_name, None)
+        if self._watching:
+            self._reload(file_name)
+
+    def _reload(self, file_name: str) -> Optional[dict]:
+        self._cache.pop(file_name, None)
+        try:
+            return self.read_from_file(file_name)
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return None
+
+    def _notify(self, changes: list[StorageChange]) -> None:
+        for listener in self._listeners:
+            listener(changes)
+
+    def subscribe(self, listener: Callable[[list[StorageChange]], None]) -> None:
+        """
+        Register a function to call with the entries that were written or deleted.
+
+        Listeners hear about writes made through this object, and about changes
+        made by other programs while the directory is being watched.
+
+        Args:
+            listener (Callable[[list[StorageChange]], None]): The function to call.
+        """
+        self._listeners.append(listener)
+
+    async def watch(self) -> None:
+        """
+        Keep the cache in sync with the directory until cancelled.
+
+        The directory is scanned once, after which only the files reported
+        as added, modified or deleted are read again. While watching,
+        `read_all_from_file` is served from memory without touching the disk.
+        """
+        from watchfiles import awatch
+
+        await self.read_all_from_file_async()
+        self._watching = True
+        try:
+            async for changes in awatch(self.directory):
+                self._apply(changes)
+        finally:
+            self._watching = False
+
+    def _apply(self, changes: set[tuple["Change", str]]) -> None:
+        from watchfiles import Change
+
+        applied: dict[str, StorageChange] = {}
+        for change, path in changes:
+            file_name = os.path.basename(path)
+            if not file_name.endswith(".json"):
+                continue
+            if change == Change.deleted:
+                self._cache.pop(file_name, None)
+                data = None
+            else:
+                data = self._reload(file_name)
+                if data is None and os.path.exists(path):
+                    # Still being written, the next change for it will pick it up.
+                    continue
+            applied[file_name] = StorageChange(file_name.removesuffix(".json"), data)
+
+        if applied:
+            self._notify(list(applied.values()))
+
+    @staticmethod
+    async def _replace(file: str, json: str) -> None:
+        """
+        Write a file through a temporary file that is renamed over it.
+
+        Readers, including the directory watcher, either see the previous
+        contents or the new ones, never a partially written file. The
+        temporary file doesn't end in `.json`, so it is never read as an entry.
+        """
+        import aiofiles
+        import aiofiles.os
+
+        directory, file_name = os.path.split(file)
+        temporary = os.path.join(directory, f".{file_name}.{os.urandom(4).hex()}.tmp")
+        try:
+            async with aiofiles.open(temporary, "w") as f:
+                await f.write(json)
+                await f.flush()
+                await asyncio.to_thread(os.fsync, f.fileno())
+            await aiofiles.os.replace(temporary, file)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temporary)
+            raise
 
     async def write_to_file(self, json: str, name_of_file: str) -> None:
         """
@@ -123,8 +279,9 @@ class Storage:
         file = os.path.join(self.directory, f"{name_of_file}.json")
         if os.path.exists(file):
             raise FileExistsError(f"{name_of_file} already exists!")
-        async with aiofiles.open(file, "w") as f:
-            await f.write(json)
+        await self._replace(file, json)
+        self._invalidate(f"{name_of_file}.json")
+        self._notify([StorageChange(name_of_file, orjson.loads(json))])
 
     async def update_file(self, json: str, name_of_file: str) -> None:
         """
@@ -143,8 +300,9 @@ class Storage:
         file = os.path.join(self.directory, f"{name_of_file}.json")
         if not os.path.exists(file):
             raise FileNotFoundError(f"{name_of_file} does not exist!")
-        async with aiofiles.open(file, "w") as f:
-            await f.write(json)
+        await self._replace(file, json)
+        self._invalidate(f"{name_of_file}.json")
+        self._notify([StorageChange(name_of_file, orjson.loads(json))])
 
     async def delete_file(self, name: str) -> None:
         """
@@ -159,33 +317,145 @@ class Storage:
         Returns:
             None
         """
+        import aiofiles.os
+
         file = os.path.join(self.directory, f"{name}.json")
         if not os.path.exists(file):
             raise FileNotFoundError(f"{name} does not exist!")
         await aiofiles.os.remove(file)
+        self._invalidate(f"{name}.json")
+        self._notify([StorageChange(name, None)])
+
+    def _read_cached(self, file_name: str, stat: os.stat_result) -> "dict":
+        cached = self._cache.get(file_name)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        with open(os.path.join(self.directory, file_name), "rb") as f:
+            data = orjson.loads(f.read())
+        self._cache[file_name] = (stat.st_mtime_ns, stat.st_size, data)
+        return data
 
     def read_from_file(self, file_name: str) -> "dict":
         """
         Reads data from a file and returns it as a dictionary.
 
+        The parsed data is cached and only read again once the file's
+        modification time or size changes. The returned dictionary is shared
+        with the cache and must not be modified.
+
         Args:
             file_name (str): The name of the file to read from.
 
         Returns:
             dict: The data read from the file as a dictionary.
         """
-        with open(os.path.join(self.directory, file_name), "r") as f:
-            return json.load(f)
+        stat = os.stat(os.path.join(self.directory, file_name))
+        return self._read_cached(file_name, stat)
 
     def read_all_from_file(self) -> list["dict"]:
         """
         Reads data from all files in the specified directory and returns a list of dictionaries.
 
+        Only files that were added or changed since the last call are opened,
+        the rest are served from the cache after checking their metadata.
+        While the directory is being watched the cache is already up to date
+        and is returned without scanning.
+
         Returns:
             A list of dictionaries containing the data read from each file.
         """
-        files = os.listdir(self.directory)
-        return [self.read_from_file(file_name) for file_name in files]
+        if self._watching:
+            return [cached[2] for cached in self._cache.values()]
+
+        data = []
+        seen = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.endswith(".json"):
+                    continue
+                seen.add(entry.name)
+                data.append(self._read_cached(entry.name, entry.stat()))
+
+        for file_name in self._cache.keys() - seen:
+            del self._cache[file_name]
+        return data
+
+    def _scan(self) -> list[tuple[str, os.stat_result]]:
+        with os.scandir(self.directory) as entries:
+            return [
+                (entry.name, entry.stat())
+                for entry in entries
+                if entry.is_file() and entry.name.endswith(".json")
+            ]
+
+    async def read_from_file_async(self, file_name: str) -> "dict":
+        """
+        Like `read_from_file`, reading the file on a reader thread if it isn't cached.
+
+        Args:
+            file_name (str): The name of the file to read from.
+
+        Returns:
+            dict: The data read from the file as a dictionary.
+        """
+        loop = asyncio.get_running_loop()
+        path = os.path.join(self.directory, file_name)
+        stat = await loop.run_in_executor(readers, os.stat, path)
+        cached = self._cache.get(file_name)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        [(_, data)] = await loop.run_in_executor(
+            readers, read_json_files, self.directory, [file_name]
+        )
+        if data is None:
+            raise FileNotFoundError(f"{file_name} does not exist!")
+        self._cache[file_name] = (stat.st_mtime_ns, stat.st_size, data)
+        return data
+
+    async def read_all_from_file_async(self) -> list["dict"]:
+        """
+        Like `read_all_from_file`, without blocking the event loop.
+
+        The directory is scanned on a reader thread, and the files that were
+        added or changed are split in chunks read and parsed by the reader
+        threads at the same time. The cache is only updated from the event loop.
+
+        Returns:
+            A list of dictionaries containing the data read from each file.
+        """
+        if self._watching:
+            return [cached[2] for cached in self._cache.values()]
+
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(readers, self._scan)
+        stats = dict(entries)
+        stale = [
+            file_name
+            for file_name, stat in entries
+            if (cached := self._cache.get(file_name)) is None
+            or cached[0] != stat.st_mtime_ns
+            or cached[1] != stat.st_size
+        ]
+        chunk_size = storage_constants.READ_CHUNK_SIZE
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    readers, read_json_files, self.directory, stale[i : i + chunk_size]
+                )
+                for i in range(0, len(stale), chunk_size)
+            )
+        )
+        for chunk in chunks:
+            for file_name, data in chunk:
+                if data is None:
+                    del stats[file_name]
+                    continue
+                stat = stats[file_name]
+                self._cache[file_name] = (stat.st_mtime_ns, stat.st_size, data)
+
+        for file_name in self._cache.keys() - stats.keys():
+            del self._cache[file_name]
+        return [self._cache[file_name][2] for file_name in stats]
 
 
 class Secrets(Storage):
@@ -198,3 +468,49 @@ class Configs(Storage):
 
 secrets = Secrets(storage_constants.SECRETS_DIR)
 configs = Configs(storage_constants.CONFIGS_DIR)
+
+
+def use_backend(backend: str) -> None:
+    """
+    Switch the module level `configs` and `secrets` to the given storage backend.
+
+    Args:
+        backend (str): `files` for one JSON file per entry, or `sqlite` for a single database.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    from .sqlite_storage import SqliteStorage
+
+    global secrets, configs
+    match backend:
+        case storage_constants.STORAGE_BACKEND_FILES:
+            secrets = Secrets(storage_constants.SECRETS_DIR)
+            configs = Configs(storage_constants.CONFIGS_DIR)
+        case storage_constants.STORAGE_BACKEND_SQLITE:
+            secrets = SqliteStorage(
+                storage_constants.STORE_DATABASE, "secrets", storage_constants.SECRETS_DIR
+            )
+            configs = SqliteStorage(
+                storage_constants.STORE_DATABASE, "configs", storage_constants.CONFIGS_DIR
+            )
+        case _:
+            raise ValueError(f"Unknown storage backend {backend}")
+
+
+def use_configured_backend() -> None:
+    """
+    Switch to the storage backend chosen in the settings, if there are any.
+    """
+    try:
+        settings = Settings()
+    except FileNotFoundError:
+        return
+    use_backend(settings.get_storage_backend())
+
+
+async def watch_all() -> None:
+    """
+    Watch the configs and secrets directories for changes made outside the app.
+    """
+    await asyncio.gather(configs.watch(), secrets.watch())